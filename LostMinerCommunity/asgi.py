@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'LostMinerCommunity.settings')
 
 application = get_asgi_application()
+
+# Tarefas periódicas (contagens, conexões expiradas, "em alta") dos processos do servidor.
+from api.utils.scheduler import start_background_tasks  # noqa: E402
+
+start_background_tasks()
@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Deve ser o primeiro, para medir a requisição inteira.
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,6 +78,83 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'LostMinerCommunity.wsgi.application'
 
+# Usa as versões assíncronas das views de leitura de conteúdos e comentários (`api.views.asynchronous`).
+# Só traz ganho quando a API roda sob ASGI, ex.: `gunicorn LostMinerCommunity.asgi:application -k uvicorn.workers.UvicornWorker`.
+ASYNC_READ_VIEWS = config('ASYNC_READ_VIEWS', default='False') == 'True'
+
+# Métricas das requisições (`api.middleware.MetricsMiddleware`), expostas em `/metrics` no formato do Prometheus.
+# A coleta deve enviar `Authorization: Bearer <METRICS_TOKEN>`; sem o token, `/metrics` só responde com DEBUG.
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# Cada worker grava as suas métricas em METRICS_MULTIPROCESS_DIR (no máximo uma vez a cada
+# METRICS_SNAPSHOT_INTERVAL_SECONDS), e `/metrics` soma as de todos. O diretório deve ser esvaziado antes de
+# iniciar os workers (veja `run.sh`). Vazio, cada worker expõe apenas as próprias métricas.
+METRICS_MULTIPROCESS_DIR = config('METRICS_MULTIPROCESS_DIR', default=str(BASE_DIR / '.cache' / 'metrics'))
+METRICS_SNAPSHOT_INTERVAL_SECONDS = 5
+# Envia as medições de cada requisição no cabeçalho `Server-Timing`.
+SERVER_TIMING = config('SERVER_TIMING', default=str(DEBUG)) == 'True'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'default': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'default',
+        },
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': config('API_LOG_LEVEL', default='INFO'),
+        },
+    },
+}
+
+# Número máximo de conteúdos por requisição de `contents/bulk`.
+CONTENT_BULK_MAX_ITEMS = 200
+
+# Nível máximo de respostas retornado por `comments/<content_id>/tree` (o parâmetro `depth` pode reduzi-lo).
+COMMENT_TREE_MAX_DEPTH = 8
+
+# Contadores de visualizações e downloads dos conteúdos (`api.utils.counters`): acumulados na memória de cada
+# processo e gravados em lote a cada intervalo. Um processo interrompido perde no máximo um intervalo de contagens;
+# `COUNTERS_MAX_PENDING` conteúdos pendentes forçam a gravação antes do intervalo.
+# A gravação periódica é opcional (0 desativa) e só roda nos processos do servidor (`run.sh` define 10 segundos);
+# sem ela, as contagens são gravadas ao atingir `COUNTERS_MAX_PENDING` e no encerramento do servidor.
+COUNTERS_FLUSH_INTERVAL_SECONDS = config('COUNTERS_FLUSH_INTERVAL_SECONDS', default=0, cast=int)
+COUNTERS_FLUSH_BATCH_SIZE = 500
+COUNTERS_MAX_PENDING = 5000
+
+# Ordenação "em alta" (`api.utils.trending`): log10 da atividade ponderada mais a idade do conteúdo, em que cada
+# `TRENDING_TIME_SCALE_SECONDS` mais novo equivale a 10x mais atividade. A fórmula não depende do momento do cálculo,
+# então só os conteúdos com atividade nova são recalculados, por `manage.py update_trending` executado uma única vez
+# por intervalo (ex.: pelo cron, a cada 5 minutos). Com um intervalo maior que 0, o cálculo também é executado
+# periodicamente em uma thread de cada processo do servidor (cada worker).
+TRENDING_VIEW_WEIGHT = 1
+TRENDING_DOWNLOAD_WEIGHT = 5
+TRENDING_COMMENT_WEIGHT = 10
+TRENDING_TIME_SCALE_SECONDS = 2 * 24 * 3600
+TRENDING_BATCH_SIZE = 1000
+TRENDING_UPDATE_INTERVAL_SECONDS = 0
+
+# Feed de alterações do catálogo (`contents/changes`). Só são retornadas as alterações com mais de
+# `CONTENT_CHANGES_SAFETY_LAG_SECONDS`, para que uma transação mais lenta, com um `id` menor, não seja pulada.
+# É uma heurística (veja `api.utils.changes.get_content_changes`): o valor deve ser maior que a duração da
+# transação de escrita mais longa.
+CONTENT_CHANGES_SAFETY_LAG_SECONDS = 5
+CONTENT_CHANGES_PAGE_SIZE = 500
+CONTENT_CHANGES_MAX_PAGE_SIZE = 2000
+
+# Exportação do catálogo em NDJSON (`contents/export` e `export_catalog`). Os conteúdos são lidos e convertidos
+# em lotes de `EXPORT_CHUNK_SIZE` linhas, com uma consulta de comentários por lote.
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_GZIP_LEVEL = 6
+
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
@@ -101,6 +180,57 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Revogações de conexões (`api.utils.security`); precisa ser compartilhado entre os workers.
+CONNECTION_REVOCATION_CACHE_ALIAS = 'connection_revocations'
+
+# Códigos de confirmação pendentes (Register/Login/SetPassword -> Authorize).
+CONFIRMATION_CODE_STORE = 'api.utils.confirmation.CacheConfirmationStore'
+CONFIRMATION_CODE_CACHE_ALIAS = 'confirmation_codes'
+CONFIRMATION_CODE_TTL_SECONDS = 3600
+CONFIRMATION_CODE_MAXSIZE = 50000
+
+# Respostas serializadas de `contents/details/<id>` e `contents/list/` (`api.utils.response_cache`).
+# O LocMemCache descarta as entradas menos usadas (LRU) além de MAX_ENTRIES e é local a cada worker.
+# As chaves incluem a geração do conteúdo (ou da listagem), trocada a cada escrita, e o ETag dos dados atuais,
+# então uma alteração feita em outro worker também nunca é mascarada;
+# com um backend compartilhado ('django.core.cache.backends.redis.RedisCache') os workers também
+# compartilham as entradas.
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT_SECONDS = 30
+RESPONSE_CACHE_MAX_ENTRIES = 5000
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    RESPONSE_CACHE_ALIAS: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'TIMEOUT': RESPONSE_CACHE_TIMEOUT_SECONDS,
+        'OPTIONS': {
+            'MAX_ENTRIES': RESPONSE_CACHE_MAX_ENTRIES,
+        },
+    },
+    # Precisam ser compartilhados entre os workers do gunicorn; em mais de um host, troque por
+    # 'django.core.cache.backends.redis.RedisCache'.
+    CONNECTION_REVOCATION_CACHE_ALIAS: {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'connection_revocations',
+    },
+    CONFIRMATION_CODE_CACHE_ALIAS: {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'confirmation_codes',
+        'TIMEOUT': CONFIRMATION_CODE_TTL_SECONDS,
+        'OPTIONS': {
+            'MAX_ENTRIES': CONFIRMATION_CODE_MAXSIZE,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -119,6 +249,12 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Fator de custo do bcrypt. Senhas com outro custo são refeitas no próximo login.
+BCRYPT_ROUNDS = 12
+
+# Processos dedicados ao bcrypt (`api.utils.security`); com 0 o hash é calculado na thread da requisição.
+PASSWORD_HASHER_WORKERS = 2
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -145,6 +281,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_TIME_MINUTES = 60
 
+# Tempo de vida de uma conexão; também define o claim `exp` dos tokens emitidos para ela.
+CONNECTION_EXPIRATION_TIME_MINUTES = 60 * 24
+
+# Com a verificação stateless ativa, tokens que carregam `usr` e `exp` são validados sem consultar o banco.
+# As revogações (ex.: pelo RefreshToken) continuam valendo: os tokens emitidos antes de uma revogação da conexão
+# ou do usuário em CONNECTION_REVOCATION_CACHE_ALIAS, cujas marcas duram então até o fim do `exp`, são
+# verificados no banco. O `RefreshToken` sempre usa a conexão gravada no banco.
+JWT_STATELESS_VERIFICATION = config('JWT_STATELESS_VERIFICATION', default='False') == 'True'
+
+# Conexões ativas mantidas por usuário; as mais antigas são removidas ao criar uma nova.
+CONNECTIONS_PER_USER_LIMIT = 10
+
+# Remoção das conexões expiradas (`manage.py reap_connections`). Com um intervalo maior que 0, a remoção
+# também é executada periodicamente em uma thread de cada processo do servidor (cada worker).
+CONNECTION_REAPER_BATCH_SIZE = 1000
+CONNECTION_REAPER_INTERVAL_SECONDS = 0
+
+# Cache em processo das conexões (com o usuário já carregado) usadas pelo `IsAuthenticated`.
+# A remoção de uma conexão ou a alteração de um usuário é marcada em `CONNECTION_REVOCATION_CACHE_ALIAS`,
+# que todos os workers consultam antes de usar uma conexão do cache: a revogação vale imediatamente
+# (exceto no modo stateless, acima).
+CONNECTION_CACHE_MAXSIZE = 10000
+CONNECTION_CACHE_TTL_SECONDS = 300
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp-relay.brevo.com'
 EMAIL_PORT = 587
@@ -152,12 +312,25 @@ EMAIL_USE_TLS = False
 EMAIL_HOST_USER = config('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
 
+# Fila de envio de e-mails em segundo plano (`api.utils.mail_queue`); com 0 workers o envio é síncrono.
+MAIL_QUEUE_WORKERS = 2
+MAIL_QUEUE_BATCH_SIZE = 20
+MAIL_QUEUE_MAX_RETRIES = 3
+MAIL_QUEUE_RETRY_BACKOFF_SECONDS = 2
+MAIL_QUEUE_IDLE_TIMEOUT_SECONDS = 30
+
 cloudinary.config(
   cloud_name="daamtcqte",
   api_key=config('API_KEY'),
   api_secret=config('API_SECRET')
 )
 
+# Armazenamento das imagens dos conteúdos (`api.utils.storage`).
+IMAGE_STORAGE_BACKEND = 'api.utils.storage.CloudinaryImageStorage'
+IMAGE_STORAGE_LOCAL_ROOT = BASE_DIR / 'media' / 'images'
+IMAGE_STORAGE_LOCAL_URL = '/media/images/'
+IMAGE_UPLOAD_MAX_WORKERS = 8
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
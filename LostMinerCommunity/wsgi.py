@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'LostMinerCommunity.settings')
 
 application = get_wsgi_application()
+
+# Tarefas periódicas (contagens, conexões expiradas, "em alta") dos processos do servidor.
+from api.utils.scheduler import start_background_tasks  # noqa: E402
+
+start_background_tasks()
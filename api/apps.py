@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Registra os receivers de sinais dos modelos.
+        from api import signals  # noqa: F401
+
+        # As tarefas em segundo plano são iniciadas apenas pelos processos do servidor
+        # (`api.utils.scheduler.start_background_tasks`, chamada em `wsgi.py` / `asgi.py`).
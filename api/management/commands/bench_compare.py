@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Métricas comparadas e se um valor maior é melhor.
+METRICS = (
+    ('p50', False),
+    ('p95', False),
+    ('p99', False),
+    ('rps', True),
+    ('queries', False),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara dois resultados de `bench_endpoints --output` rota a rota e aponta as regressões: latências ou '
+        'consultas por requisição maiores, ou requisições por segundo menores, além da tolerância.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('baseline', type=Path, help='Resultado de referência.')
+        parser.add_argument('current', type=Path, help='Resultado comparado com a referência.')
+        parser.add_argument(
+            '--threshold', type=float, default=10.0,
+            help='Variação percentual tolerada nas latências e nas requisições por segundo.'
+        )
+        parser.add_argument('--fail', action='store_true', help='Termina com erro se houver alguma regressão.')
+
+    def handle(self, *args, **options):
+        baseline, current = self.load(options['baseline']), self.load(options['current'])
+        threshold = options['threshold']
+
+        for name in ('vendor', 'mode', 'users', 'contents', 'comments'):
+            if baseline['meta'].get(name) != current['meta'].get(name):
+                self.stdout.write(self.style.WARNING(
+                    f'{name} differs: {baseline["meta"].get(name)} -> {current["meta"].get(name)}'
+                ))
+
+        self.stdout.write(f'{"route":<16} ' + ' '.join(f'{name:>22}' for name, _ in METRICS))
+
+        regressions = []
+
+        for route in sorted(baseline['routes'].keys() | current['routes'].keys()):
+            before, after = baseline['routes'].get(route), current['routes'].get(route)
+
+            if before is None or after is None:
+                self.stdout.write(f'{route:<16} ' + ('only in current' if before is None else 'only in baseline'))
+                continue
+
+            cells, regressed = [], False
+
+            for name, higher_is_better in METRICS:
+                change = (after[name] - before[name]) / before[name] * 100 if before[name] else 0.0
+
+                # Com a mesma semente o número de consultas é determinístico: qualquer aumento é uma regressão.
+                if name == 'queries':
+                    worse = round(after[name], 1) > round(before[name], 1)
+                else:
+                    worse = (-change if higher_is_better else change) > threshold
+
+                regressed |= worse
+                cells.append(f'{before[name]:.1f}->{after[name]:.1f} ({change:+.0f}%)' + ('!' if worse else ' '))
+
+            if after.get('errors', 0) > before.get('errors', 0):
+                regressed = True
+                cells.append(f'errors {before.get("errors", 0)}->{after["errors"]}')
+
+            line = f'{route:<16} ' + ' '.join(f'{cell:>22}' for cell in cells)
+
+            self.stdout.write(self.style.ERROR(line) if regressed else line)
+
+            if regressed:
+                regressions.append(route)
+
+        if regressions:
+            message = f'{len(regressions)} routes regressed: {", ".join(regressions)}.'
+
+            if options['fail']:
+                raise CommandError(message)
+
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No regressions.'))
+
+    @staticmethod
+    def load(path: Path) -> dict:
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Could not read {path}: {error}')
+
+        if not isinstance(data, dict) or 'routes' not in data:
+            raise CommandError(f'{path} is not a bench_endpoints result.')
+
+        data.setdefault('meta', {})
+
+        return data
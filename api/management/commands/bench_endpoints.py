@@ -0,0 +1,590 @@
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.client import HTTPConnection
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter
+from typing import Any, Optional
+from urllib.parse import urlencode
+from uuid import uuid4
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from LostMinerCommunity import settings
+from api.models import Comment, Connection, Content, ContentChange, User
+from api.urls import urlpatterns
+from api.utils.activity import recount_comments
+from api.utils.benchmark import local_services, rolled_back, summarize
+from api.utils.counters import content_counters
+from api.utils.security import create_token, hash_password
+from api.views.auth import auth_processing_cache
+
+from django import get_version
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.test import Client
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+WORDS = (
+    'pixel', 'stone', 'forest', 'ocean', 'castle', 'dungeon', 'village', 'desert', 'snow', 'nether',
+    'dragon', 'knight', 'zombie', 'creeper', 'redstone', 'diamond', 'emerald', 'lava', 'cave', 'island',
+)
+
+BENCH_PASSWORD = 'benchmark-password'
+
+# PNG de 1x1 pixel enviado para `contents/upload_images/<id>`.
+PNG_BYTES = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082'
+)
+
+
+@dataclass
+class Call:
+    """
+        Uma requisição planejada para uma rota, com o status esperado na resposta.
+    """
+    method: str
+    path: str
+    data: Any = None
+    token: Optional[str] = None
+    expected: int = 200
+    multipart: bool = False
+
+    def encode(self) -> tuple[str, bytes, Optional[str]]:
+        """
+            Caminho (com a query string), corpo e `Content-Type` da requisição.
+        """
+        if self.method == 'GET':
+            return (f'{self.path}?{urlencode(self.data)}' if self.data else self.path), b'', None
+
+        if self.multipart:
+            return self.path, encode_multipart(BOUNDARY, self.data), MULTIPART_CONTENT
+
+        return self.path, json.dumps(self.data).encode('utf-8'), 'application/json'
+
+
+@dataclass
+class Result:
+    status: int
+    seconds: float
+    queries: int
+
+
+@dataclass
+class RouteReport:
+    results: list[Result] = field(default_factory=list)
+    expected: list[int] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        seconds = [result.seconds for result in self.results]
+        queries = [result.queries for result in self.results]
+        statuses = {}
+
+        for result in self.results:
+            statuses[str(result.status)] = statuses.get(str(result.status), 0) + 1
+
+        return {
+            'requests': len(self.results),
+            'errors': sum(result.status != expected for result, expected in zip(self.results, self.expected)),
+            'statuses': statuses,
+            **summarize(seconds),
+            'rps': len(seconds) / sum(seconds) if sum(seconds) else 0.0,
+            'queries': sum(queries) / len(queries) if queries else 0.0,
+            'queries_max': max(queries, default=0),
+        }
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede todas as rotas de `api/urls.py` sobre uma base gerada (usuários, conexões, conteúdos e comentários '
+        'aninhados): latência p50/p95/p99, requisições por segundo e consultas por requisição. As requisições são '
+        'feitas em sequência pelo cliente de testes do Django ou, com `--server`, por HTTP a um servidor WSGI local. '
+        'O SMTP e o Cloudinary são substituídos pelo backend `locmem` e pelo `LocalImageStorage`, e os dados são '
+        'criados em uma transação desfeita ao final. Com `--output`, o resultado é gravado em JSON para '
+        'comparação com `bench_compare`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Número de usuários gerados.')
+        parser.add_argument('--connections', type=int, default=400, help='Número de conexões (ao menos uma por usuário).')
+        parser.add_argument('--contents', type=int, default=5000, help='Número de conteúdos gerados.')
+        parser.add_argument('--comments', type=int, default=20000, help='Número de comentários gerados.')
+        parser.add_argument('--depth', type=int, default=3, help='Profundidade máxima das respostas geradas.')
+        parser.add_argument('--requests', type=int, default=50, help='Requisições medidas por rota.')
+        parser.add_argument('--warmup', type=int, default=5, help='Requisições de aquecimento por rota (não medidas).')
+        parser.add_argument('--routes', nargs='+', help='Mede apenas as rotas informadas (nomes de `api/urls.py`).')
+        parser.add_argument('--server', action='store_true', help='Faz as requisições por HTTP a um servidor WSGI local.')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Tamanho dos lotes de inserção.')
+        parser.add_argument('--seed', type=int, default=0, help='Semente dos dados e das requisições.')
+        parser.add_argument('--output', type=Path, help='Arquivo JSON em que o resultado é gravado.')
+
+    def handle(self, *args, **options):
+        routes = [pattern.name for pattern in urlpatterns]
+
+        # Toda rota nova precisa de um plano de requisições aqui, para que a medição continue cobrindo a API inteira.
+        missing = [name for name in routes if not hasattr(self, f'plan_{name}')]
+
+        if missing:
+            raise CommandError(f'No benchmark plan for routes: {", ".join(missing)}.')
+
+        if options['routes']:
+            unknown = set(options['routes']) - set(routes)
+
+            if unknown:
+                raise CommandError(f'Unknown routes: {", ".join(sorted(unknown))}.')
+
+            routes = [name for name in routes if name in options['routes']]
+
+        self.random = Random(options['seed'])
+        self.prefix = f'bench{uuid4().hex[:8]}'
+        self.batch_size = options['batch_size']
+        self.depth = min(options['depth'], settings.COMMENT_TREE_MAX_DEPTH)
+
+        reports = {}
+        count = options['warmup'] + options['requests']
+
+        with TemporaryDirectory() as image_root, local_services(image_root), override_settings(SECURE_SSL_REDIRECT=False):
+            with rolled_back():
+                start = perf_counter()
+                self.seed(options)
+                self.stdout.write(
+                    f'seeded {options["users"]} users, {options["contents"]} contents and {options["comments"]} '
+                    f'comments in {perf_counter() - start:.1f}s ({connection.vendor})'
+                )
+
+                run = self.run_server if options['server'] else self.run_client
+
+                for name in routes:
+                    calls = getattr(self, f'plan_{name}')(count)
+                    results = run(calls)[options['warmup']:]
+
+                    # Grava as contagens de visualizações e downloads na própria transação, antes que o
+                    # `content_counters` tente gravá-las em outra thread, fora dela.
+                    content_counters.flush()
+
+                    reports[name] = RouteReport(results, [call.expected for call in calls[options['warmup']:]]).as_dict()
+
+        self.write_table(reports)
+
+        if options['output']:
+            baseline = {
+                'meta': {
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                    'vendor': connection.vendor,
+                    'django': get_version(),
+                    'mode': 'server' if options['server'] else 'client',
+                    **{
+                        name: options[name]
+                        for name in ('users', 'connections', 'contents', 'comments', 'depth', 'requests', 'seed')
+                    },
+                },
+                'routes': reports,
+            }
+
+            options['output'].write_text(json.dumps(baseline, indent=2))
+
+            self.stdout.write(f'baseline written to {options["output"]}')
+
+    def write_table(self, reports: dict):
+        self.stdout.write(
+            f'{"route":<16} {"reqs":>5} {"errors":>6} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"req/s":>8} {"q/req":>6}'
+        )
+
+        for name, report in reports.items():
+            line = (
+                f'{name:<16} {report["requests"]:>5} {report["errors"]:>6} {report["p50"]:>8.2f} {report["p95"]:>8.2f} '
+                f'{report["p99"]:>8.2f} {report["rps"]:>8.1f} {report["queries"]:>6.1f}'
+            )
+
+            self.stdout.write(self.style.ERROR(line) if report['errors'] else line)
+
+    def run_client(self, calls: list[Call]) -> list[Result]:
+        client = Client()
+        results = []
+
+        for call in calls:
+            path, body, content_type = call.encode()
+            headers = {'HTTP_AUTHORIZATION': f'Bearer {call.token}'} if call.token else {}
+
+            with CaptureQueriesContext(connection) as queries:
+                start = perf_counter()
+                response = client.generic(
+                    call.method, path, body, content_type or 'application/octet-stream', **headers
+                )
+
+                # Uma resposta transmitida só consulta o banco à medida que é lida.
+                if response.streaming:
+                    b''.join(response.streaming_content)
+
+                seconds = perf_counter() - start
+
+            results.append(Result(response.status_code, seconds, len(queries)))
+
+        return results
+
+    def run_server(self, calls: list[Call]) -> list[Result]:
+        """
+                Atende as requisições nesta thread, dentro da transação dos dados gerados, enquanto uma segunda
+            thread as envia por HTTP e mede a latência vista pelo cliente.
+        """
+        application = WSGIHandler()
+        query_counts, responses = [], []
+
+        def counted(environ, start_response):
+            # A resposta é lida aqui, para que as consultas de uma resposta transmitida também sejam contadas.
+            with CaptureQueriesContext(connection) as queries:
+                response = application(environ, start_response)
+                body = list(response)
+                response.close()
+
+            query_counts.append(len(queries))
+
+            return body
+
+        def send(host: str, port: int):
+            for call in calls:
+                path, body, content_type = call.encode()
+                headers = {'Authorization': f'Bearer {call.token}'} if call.token else {}
+
+                if content_type:
+                    headers['Content-Type'] = content_type
+
+                client = HTTPConnection(host, port, timeout=30)
+
+                start = perf_counter()
+                client.request(call.method, path, body or None, headers)
+                response = client.getresponse()
+                response.read()
+                responses.append((response.status, perf_counter() - start))
+
+                client.close()
+
+        # Ao fim de cada requisição o Django fecharia a conexão com o banco, desfazendo os dados gerados.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+
+        try:
+            with make_server('127.0.0.1', 0, counted, handler_class=QuietRequestHandler) as server:
+                server.timeout = 30
+                sender = Thread(target=send, args=server.server_address, daemon=True)
+                sender.start()
+
+                while len(query_counts) < len(calls) and sender.is_alive():
+                    server.handle_request()
+
+                sender.join()
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        if len(responses) != len(calls):
+            raise CommandError(f'Only {len(responses)} of {len(calls)} requests were answered by the local server.')
+
+        return [Result(status, seconds, queries) for (status, seconds), queries in zip(responses, query_counts)]
+
+    def seed(self, options: dict):
+        random = self.random
+        password = hash_password(BENCH_PASSWORD)
+
+        self.users = self.create_users(max(options['users'], 1), password)
+
+        connections = Connection.objects.bulk_create([
+            Connection(user=self.users[index % len(self.users)])
+            for index in range(max(options['connections'], len(self.users)))
+        ], batch_size=self.batch_size)
+
+        self.tokens = {}
+
+        for item in connections:
+            self.tokens.setdefault(item.user_id, create_token(item))
+
+        categories = [choice for choice, _ in Content.category_choices]
+        self.contents = []
+
+        for offset in range(0, max(options['contents'], 1), self.batch_size):
+            self.contents += Content.objects.bulk_create([
+                Content(
+                    name=' '.join(random.sample(WORDS, 3)).title(),
+                    description=' '.join(random.choices(WORDS, k=random.randint(5, 20))),
+                    author=random.choice(self.users),
+                    category=random.choice(categories),
+                    version=f'{self.prefix}.{index}',
+                    resolution=random.choice((16, 32, 64, 128)),
+                    download_url=f'https://example.com/{self.prefix}/{index}',
+                )
+                for index in range(offset, min(offset + self.batch_size, max(options['contents'], 1)))
+            ])
+
+        # Metade dos comentários no primeiro nível e, a cada nível seguinte, metade dos restantes,
+        # respondendo a comentários do nível anterior; o último nível recebe o que sobrar.
+        self.comments = []
+        remaining, parents = max(options['comments'], 1), []
+
+        for depth in range(self.depth + 1):
+            if remaining <= 0:
+                break
+
+            total = remaining if depth == self.depth else (remaining + 1) // 2
+            level = []
+
+            for _ in range(total):
+                author = random.choice(self.users)
+
+                if depth:
+                    parent = random.choice(parents)
+                    level.append(Comment(
+                        content_id=parent.content_id, author=author, text=' '.join(random.choices(WORDS, k=8)),
+                        answering=parent, root_id=parent.root_id or parent.id, depth=depth
+                    ))
+                else:
+                    level.append(Comment(
+                        content=random.choice(self.contents), author=author, text=' '.join(random.choices(WORDS, k=8))
+                    ))
+
+            parents = Comment.objects.bulk_create(level, batch_size=self.batch_size)
+            self.comments += parents
+            remaining -= total
+
+        recount_comments(self.batch_size)
+
+    def create_users(self, total: int, password: str = None) -> list[User]:
+        offset = getattr(self, 'created_users', 0)
+        self.created_users = offset + total
+
+        return User.objects.bulk_create([
+            User(
+                username=f'{self.prefix}_{index}', email=f'{self.prefix}_{index}@example.com',
+                password=password, is_creator=True
+            )
+            for index in range(offset, offset + total)
+        ], batch_size=self.batch_size)
+
+    def create_sessions(self, total: int, password: str = None) -> list[tuple[User, str]]:
+        """
+                Usuários exclusivos de uma rota, cada um com uma conexão: `refresh_token`, `authorize` e `login`
+            removem ou criam conexões, o que não pode afetar os tokens usados pelas outras rotas.
+        """
+        users = self.create_users(total, password)
+        connections = Connection.objects.bulk_create([Connection(user=user) for user in users])
+
+        return [(user, create_token(item)) for user, item in zip(users, connections)]
+
+    def token_for(self, user_id: int) -> str:
+        return self.tokens[user_id]
+
+    def random_token(self) -> str:
+        return self.token_for(self.random.choice(self.users).id)
+
+    def new_content_data(self, index: int) -> dict:
+        return {
+            'name': f'{self.prefix} {self.random.choice(WORDS)} {index}',
+            'description': ' '.join(self.random.choices(WORDS, k=10)),
+            'category': self.random.choice(Content.category_choices)[0],
+            'version': f'{self.prefix}.{uuid4().hex[:8]}',
+            'resolution': 16,
+            'download_url': f'https://example.com/{self.prefix}/{uuid4().hex}',
+        }
+
+    # Planos de requisição de cada rota, pelo nome em `api/urls.py`.
+
+    def plan_authorize(self, count: int) -> list[Call]:
+        calls = []
+
+        for user, _ in self.create_sessions(count):
+            code = uuid4().hex[:6]
+            auth_processing_cache[code] = {'email': user.email, 'operation': 'login'}
+
+            calls.append(Call('POST', reverse('authorize'), {'code': code}))
+
+        return calls
+
+    def plan_register(self, count: int) -> list[Call]:
+        return [
+            Call('POST', reverse('register'), {
+                'username': f'{self.prefix}_register_{index}', 'email': f'{self.prefix}_register_{index}@example.com'
+            }, expected=201)
+            for index in range(count)
+        ]
+
+    def plan_login(self, count: int) -> list[Call]:
+        return [
+            Call('POST', reverse('login'), {'email': user.email, 'password': BENCH_PASSWORD})
+            for user, _ in self.create_sessions(count, hash_password(BENCH_PASSWORD))
+        ]
+
+    def plan_set_password(self, count: int) -> list[Call]:
+        return [
+            Call('PUT', reverse('set_password'), {'password': BENCH_PASSWORD}, self.random_token(), 201)
+            for _ in range(count)
+        ]
+
+    def plan_refresh_token(self, count: int) -> list[Call]:
+        return [Call('PUT', reverse('refresh_token'), token=token) for _, token in self.create_sessions(count)]
+
+    def plan_create_content(self, count: int) -> list[Call]:
+        return [
+            Call('POST', reverse('create_content'), self.new_content_data(index), self.random_token(), 201)
+            for index in range(count)
+        ]
+
+    def plan_bulk_contents(self, count: int) -> list[Call]:
+        return [
+            Call(
+                'POST', reverse('bulk_contents'),
+                [self.new_content_data(index) for index in range(10)], self.random_token(), 201
+            )
+            for _ in range(count)
+        ]
+
+    def plan_get_content(self, count: int) -> list[Call]:
+        return [
+            Call('GET', reverse('get_content', kwargs={'id': self.random.choice(self.contents).id}))
+            for _ in range(count)
+        ]
+
+    def plan_download_content(self, count: int) -> list[Call]:
+        return [
+            Call('GET', reverse('download_content', kwargs={'id': self.random.choice(self.contents).id}), expected=302)
+            for _ in range(count)
+        ]
+
+    def plan_pagination(self, count: int) -> list[Call]:
+        params = (
+            {}, {'cursor': ''}, {'category': 'texture'}, {'ordering': '-comment_count'},
+            {'category': 'texture', 'ordering': '-trending_score', 'cursor': ''},
+            {'resolution': 32, 'version': self.prefix},
+        )
+
+        return [Call('GET', reverse('pagination'), self.random.choice(params)) for _ in range(count)]
+
+    def plan_search_contents(self, count: int) -> list[Call]:
+        return [
+            Call('GET', reverse('search_contents'), {'q': ' '.join(self.random.sample(WORDS, 2))})
+            for _ in range(count)
+        ]
+
+    def plan_content_changes(self, count: int) -> list[Call]:
+        # Alterações dentro da margem de segurança do feed não seriam retornadas.
+        ContentChange.objects.update(created_at=F('created_at') - timedelta(seconds=settings.CONTENT_CHANGES_SAFETY_LAG_SECONDS))
+
+        watermarks = list(ContentChange.objects.order_by('id').values_list('id', flat=True))
+
+        return [
+            Call('GET', reverse('content_changes'), {'since': self.random.choice(watermarks) if watermarks else 0, 'limit': 100})
+            for _ in range(count)
+        ]
+
+    def plan_export_contents(self, count: int) -> list[Call]:
+        params = (
+            {'category': 'texture'}, {'category': 'texture', 'comments': 'true'},
+            {'category': 'texture', 'gzip': 'true'}, {'resolution': 32, 'version': self.prefix},
+        )
+
+        return [Call('GET', reverse('export_contents'), self.random.choice(params)) for _ in range(count)]
+
+    def plan_update_content(self, count: int) -> list[Call]:
+        calls = []
+
+        for _ in range(count):
+            content = self.random.choice(self.contents)
+
+            calls.append(Call(
+                'PATCH', reverse('update_content', kwargs={'id': content.id}),
+                {'description': ' '.join(self.random.choices(WORDS, k=10))}, self.token_for(content.author_id)
+            ))
+
+        return calls
+
+    def plan_delete_content(self, count: int) -> list[Call]:
+        author = self.random.choice(self.users)
+        contents = Content.objects.bulk_create([
+            Content(author=author, **self.new_content_data(index)) for index in range(count)
+        ])
+
+        return [
+            Call('DELETE', reverse('delete_content', kwargs={'id': content.id}), token=self.token_for(author.id), expected=204)
+            for content in contents
+        ]
+
+    def plan_upload_images(self, count: int) -> list[Call]:
+        calls = []
+
+        for _ in range(count):
+            content = self.random.choice(self.contents)
+
+            calls.append(Call(
+                'POST', reverse('upload_images', kwargs={'id': content.id}),
+                {'cover': SimpleUploadedFile('cover.png', PNG_BYTES, 'image/png')},
+                self.token_for(content.author_id), multipart=True
+            ))
+
+        return calls
+
+    def plan_create_comment(self, count: int) -> list[Call]:
+        calls = []
+
+        for _ in range(count):
+            parent = self.random.choice(self.comments)
+            data = {'text': ' '.join(self.random.choices(WORDS, k=8))}
+
+            # Metade das requisições responde a um comentário existente.
+            if self.random.random() < 0.5 and parent.depth < settings.COMMENT_TREE_MAX_DEPTH:
+                data['answering'] = parent.id
+
+            calls.append(Call(
+                'POST', reverse('create_comment', kwargs={'content_id': parent.content_id}), data,
+                self.random_token(), 201
+            ))
+
+        return calls
+
+    def plan_list_comments(self, count: int) -> list[Call]:
+        return [
+            Call('GET', reverse('list_comments', kwargs={'content_id': self.random.choice(self.comments).content_id}))
+            for _ in range(count)
+        ]
+
+    def plan_comment_tree(self, count: int) -> list[Call]:
+        return [
+            Call('GET', reverse('comment_tree', kwargs={'content_id': self.random.choice(self.comments).content_id}))
+            for _ in range(count)
+        ]
+
+    def plan_update_comment(self, count: int) -> list[Call]:
+        calls = []
+
+        for _ in range(count):
+            comment = self.random.choice(self.comments)
+
+            calls.append(Call(
+                'PATCH', reverse('update_comment', kwargs={'id': comment.id}),
+                {'text': ' '.join(self.random.choices(WORDS, k=8))}, self.token_for(comment.author_id)
+            ))
+
+        return calls
+
+    def plan_delete_comment(self, count: int) -> list[Call]:
+        author = self.random.choice(self.users)
+        comments = Comment.objects.bulk_create([
+            Comment(content=self.random.choice(self.contents), author=author, text=' '.join(self.random.choices(WORDS, k=8)))
+            for _ in range(count)
+        ])
+
+        return [
+            Call('DELETE', reverse('delete_comment', kwargs={'id': comment.id}), token=self.token_for(author.id), expected=204)
+            for comment in comments
+        ]
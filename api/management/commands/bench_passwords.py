@@ -0,0 +1,38 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from time import perf_counter
+
+from LostMinerCommunity import settings
+from api.utils.hashing import bcrypt_check, bcrypt_hash
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Mede quantos logins (verificações bcrypt) por segundo o pool de senhas sustenta, no total e por núcleo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=settings.BCRYPT_ROUNDS, help='Fator de custo do bcrypt.')
+        parser.add_argument('--workers', type=int, default=settings.PASSWORD_HASHER_WORKERS or 1, help='Processos do pool.')
+        parser.add_argument('--logins', type=int, default=50, help='Número de verificações medidas.')
+
+    def handle(self, *args, **options):
+        rounds, workers, logins = options['rounds'], options['workers'], options['logins']
+
+        password = b'benchmark-password'
+        hashed = bcrypt_hash(password, rounds)
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as executor:
+            # Aquecimento: inicia todos os processos antes da medição.
+            list(executor.map(bcrypt_check, [password] * workers, [hashed] * workers))
+
+            start = perf_counter()
+            results = list(executor.map(bcrypt_check, [password] * logins, [hashed] * logins))
+            elapsed = perf_counter() - start
+
+        assert all(results)
+
+        rate = logins / elapsed
+
+        self.stdout.write(f'rounds={rounds} workers={workers} logins={logins} elapsed={elapsed:.2f}s')
+        self.stdout.write(f'{rate:.1f} logins/s ({rate / workers:.1f} logins/s per core)')
@@ -0,0 +1,75 @@
+from random import Random
+from time import perf_counter
+
+from api.models import Content, User
+from api.utils.benchmark import rolled_back, summarize
+from api.utils.search import search_contents
+from api.utils.serializers import ContentSerializer
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+WORDS = (
+    'pixel', 'stone', 'forest', 'ocean', 'castle', 'dungeon', 'village', 'desert', 'snow', 'nether',
+    'dragon', 'knight', 'zombie', 'creeper', 'redstone', 'diamond', 'emerald', 'lava', 'cave', 'island',
+    'medieval', 'modern', 'fantasy', 'realistic', 'cartoon', 'dark', 'bright', 'classic', 'smooth', 'rustic',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a latência da busca textual (`contents/search`) sobre um catálogo gerado; '
+        'os dados são criados em uma transação desfeita ao final.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contents', type=int, default=100_000, help='Número de conteúdos gerados.')
+        parser.add_argument('--queries', type=int, default=200, help='Número de buscas medidas.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Tamanho dos lotes de inserção.')
+        parser.add_argument('--seed', type=int, default=0, help='Semente dos dados e das buscas.')
+
+    def handle(self, *args, **options):
+        random = Random(options['seed'])
+
+        with rolled_back():
+            start = perf_counter()
+            self.seed(random, options['contents'], options['batch_size'])
+            self.stdout.write(f'seeded {options["contents"]} contents in {perf_counter() - start:.1f}s ({connection.vendor})')
+
+            contents = ContentSerializer.setup_eager_loading(Content.objects.all())
+            samples, matches = [], 0
+
+            for _ in range(options['queries']):
+                query = ' '.join(random.sample(WORDS, random.randint(1, 2)))
+
+                start = perf_counter()
+                page = list(search_contents(contents, query).order_by('-rank', '-id')[:11])
+                samples.append(perf_counter() - start)
+
+                matches += bool(page)
+
+        summary = summarize(samples)
+
+        self.stdout.write(
+            f'{options["queries"]} queries ({matches} with results): '
+            + ' '.join(f'{name}={value:.2f}ms' for name, value in summary.items())
+        )
+
+    @staticmethod
+    def seed(random: Random, total: int, batch_size: int):
+        author = User.objects.create(username='bench_search', email='bench_search@example.com')
+        categories = [choice for choice, _ in Content.category_choices]
+
+        for offset in range(0, total, batch_size):
+            Content.objects.bulk_create([
+                Content(
+                    name=' '.join(random.sample(WORDS, 3)).title(),
+                    description=' '.join(random.choices(WORDS, k=random.randint(5, 20))),
+                    author=author,
+                    category=random.choice(categories),
+                    version=f'1.{index}',
+                    resolution=random.choice((16, 32, 64, 128)),
+                    download_url=f'https://example.com/bench_search/{index}',
+                )
+                for index in range(offset, min(offset + batch_size, total))
+            ])
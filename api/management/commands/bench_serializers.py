@@ -0,0 +1,143 @@
+from random import Random
+from time import perf_counter
+
+from api.models import Comment, Content, User
+from api.utils.benchmark import rolled_back
+from api.utils.fast_serializers import CommentValuesSerializer, ContentValuesSerializer
+from api.utils.renderers import FastJSONRenderer
+from api.utils.serializers import CommentSerializer, ContentSerializer
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+# Textos com os casos que mais divergem entre codificadores JSON.
+SAMPLES = (
+    'Pacote de texturas', 'ação e coração', 'emoji 🎮⛏️', 'aspas "duplas" e \\ barra', 'linha\nnova\ttab',
+    'controle \x01\x1f', 'separadores   e  ', '', '日本語のテクスチャ', '</script>',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Verifica que as listagens rápidas (`api.utils.fast_serializers` + `FastJSONRenderer`) geram '
+        'exatamente os mesmos bytes que os serializers do DRF e mede as linhas por segundo de cada caminho. '
+        'Os dados são criados em uma transação desfeita ao final.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Linhas por página (page_size).')
+        parser.add_argument('--rounds', type=int, default=50, help='Número de páginas medidas por caminho.')
+        parser.add_argument('--seed', type=int, default=0, help='Semente dos dados gerados.')
+
+    def handle(self, *args, **options):
+        rows, rounds = options['rows'], options['rounds']
+
+        with rolled_back():
+            content = self.seed(Random(options['seed']), rows)
+
+            cases = [
+                (
+                    'contents', ContentSerializer, ContentValuesSerializer(),
+                    ContentSerializer.setup_eager_loading(Content.objects.order_by('created_at', 'id'))[:rows]
+                ),
+                (
+                    'comments', CommentSerializer, CommentValuesSerializer(),
+                    CommentSerializer.setup_eager_loading(
+                        Comment.objects.filter(content=content).order_by('created_at', 'id')
+                    )[:rows]
+                ),
+            ]
+
+            for name, serializer_class, values_serializer, queryset in cases:
+                self.check_parity(name, serializer_class, values_serializer, queryset)
+
+                # `queryset.all()` força uma nova consulta a cada página, como em uma requisição.
+                drf = self.measure(rounds, lambda: JSONRenderer().render(
+                    serializer_class(queryset.all(), many=True).data
+                ))
+                fast = self.measure(rounds, lambda: FastJSONRenderer().render(
+                    values_serializer.serialize(values_serializer.values(queryset))
+                ))
+
+                self.stdout.write(
+                    f'{name}: drf={rows * rounds / drf:,.0f} rows/s fast={rows * rounds / fast:,.0f} rows/s '
+                    f'({drf / fast:.1f}x)'
+                )
+
+    def check_parity(self, name: str, serializer_class, values_serializer, queryset):
+        drf_data = serializer_class(queryset, many=True).data
+        expected = JSONRenderer().render(drf_data)
+
+        outputs = {
+            'fast renderer': FastJSONRenderer().render(drf_data),
+            'values serializer': JSONRenderer().render(values_serializer.serialize(values_serializer.values(queryset))),
+            'values serializer + fast renderer': FastJSONRenderer().render(
+                values_serializer.serialize(values_serializer.values(queryset))
+            ),
+        }
+
+        for path, output in outputs.items():
+            if output != expected:
+                position = next(
+                    (index for index, (a, b) in enumerate(zip(output, expected)) if a != b),
+                    min(len(output), len(expected))
+                )
+
+                raise CommandError(
+                    f'{name}: {path} differs from DRF at byte {position}: '
+                    f'{output[position - 40:position + 40]!r} != {expected[position - 40:position + 40]!r}'
+                )
+
+        self.stdout.write(self.style.SUCCESS(f'{name}: output identical to DRF ({len(expected)} bytes)'))
+
+    @staticmethod
+    def measure(rounds: int, function) -> float:
+        function()
+
+        start = perf_counter()
+
+        for _ in range(rounds):
+            function()
+
+        return perf_counter() - start
+
+    @staticmethod
+    def seed(random: Random, rows: int) -> Content:
+        authors = [
+            User.objects.create(username=f'bench_serializers_{index}', email=f'bench_serializers_{index}@example.com')
+            for index in range(3)
+        ]
+        authors[1].username = SAMPLES[2]
+        authors[1].save(update_fields=['username'])
+
+        contents = Content.objects.bulk_create([
+            Content(
+                name=f'{random.choice(SAMPLES)[:40]} {index}',
+                description=random.choice((None, *SAMPLES)),
+                author=random.choice(authors),
+                category=random.choice(('texture', 'world', 'skin')),
+                version=f'1.{index}',
+                resolution=random.choice((None, 16, 32)),
+                download_url=f'https://example.com/bench_serializers/{index}',
+                images_urls=random.choice(({}, {'cover': f'https://example.com/{index}.png', 'alt': SAMPLES[1]})),
+                comment_count=random.randint(0, 500),
+            )
+            for index in range(rows)
+        ])
+        content = contents[0]
+
+        comments = []
+
+        for index in range(rows):
+            answering = random.choice(comments) if comments and random.random() < 0.6 else None
+
+            comments.append(Comment.objects.create(
+                content=content,
+                author=random.choice(authors),
+                text=random.choice(SAMPLES) or '-',
+                answering=answering,
+                root_id=(answering.root_id or answering.id) if answering else None,
+                depth=answering.depth + 1 if answering else 0,
+            ))
+
+        return content
@@ -0,0 +1,142 @@
+from api.models import Connection, Content, ContentChange, Comment
+from api.utils.serializers import ContentSerializer, CommentSerializer
+from api.utils.pagination import KeysetPagination
+from api.utils.search import search_contents
+from api.utils.filters import ContentFilterBackend
+from api.utils.security import CONNECTION_LIFETIME
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import QuerySet
+from django.utils.timezone import now
+
+
+class Command(BaseCommand):
+    help = 'Mostra o plano de execução (EXPLAIN) das consultas de cada endpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true', help='Executa as consultas (EXPLAIN ANALYZE, apenas PostgreSQL).')
+        parser.add_argument('--only', help='Mostra apenas as consultas cujo nome contém este texto.')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Falha se algum filtro de `contents/list/` percorrer a tabela inteira de conteúdos.'
+        )
+
+    def handle(self, *args, **options):
+        explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+        filter_queries = self.get_filter_queries()
+        full_scans = []
+
+        for name, queryset in self.get_queries() + filter_queries:
+            if options['only'] and options['only'] not in name:
+                continue
+
+            plan = queryset.explain(**explain_options)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(plan)
+            self.stdout.write('')
+
+            if (name, queryset) in filter_queries and self.is_full_scan(plan, Content._meta.db_table):
+                full_scans.append(name)
+
+        if options['check']:
+            if full_scans:
+                raise CommandError('Consultas sem índice: ' + ', '.join(full_scans))
+
+            self.stdout.write(self.style.SUCCESS('Todos os filtros usam índices.'))
+
+    @staticmethod
+    def is_full_scan(plan: str, table: str) -> bool:
+        """
+            Indica se o plano percorre a tabela inteira (`SCAN tabela` no SQLite, `Seq Scan on tabela` no
+            PostgreSQL). Em tabelas pequenas o PostgreSQL prefere a leitura sequencial, então a verificação
+            só é significativa com dados.
+        """
+        for line in plan.splitlines():
+            if f'Seq Scan on {table} ' in line + ' ' or line.rstrip().endswith(f'SCAN {table}'):
+                return True
+
+        return False
+
+    @staticmethod
+    def get_filter_queries() -> list[tuple[str, QuerySet]]:
+        """
+            Consultas de `contents/list/` para cada combinação de filtros (`api.utils.filters`).
+        """
+        contents = ContentSerializer.setup_eager_loading(Content.objects.all()).order_by('created_at')
+        backend = ContentFilterBackend()
+        combinations = [
+            {'category': 'texture'},
+            {'version': '1.20'},
+            {'category': 'texture', 'version': '1.20'},
+            {'category': 'texture', 'resolution': '16'},
+            {'category': 'texture', 'resolution': '16', 'version': '1.20'},
+            {'category': 'texture', 'resolution_min': '16', 'resolution_max': '64'},
+            {'category': 'texture', 'resolution_min': '16', 'resolution_max': '64', 'version': '1.20'},
+            {'author': '1'},
+            {'author': '1', 'category': 'texture'},
+        ]
+
+        return [
+            (
+                'contents/list/ ' + ' '.join(f'{param}={value}' for param, value in params.items()),
+                backend.filter_params(contents, params)[:10]
+            )
+            for params in combinations
+        ]
+
+    @staticmethod
+    def get_queries() -> list[tuple[str, QuerySet]]:
+        """
+            Reproduz as consultas feitas pelas views, com IDs e valores de exemplo.
+        """
+        content_id = Content.objects.values_list('id', flat=True).first() or 1
+        connection_id, user_id = Connection.objects.values_list('id', 'user_id').first() or (1, 1)
+        timestamp = now()
+        keyset_filter = KeysetPagination.get_keyset_filter
+
+        contents = ContentSerializer.setup_eager_loading(Content.objects.all())
+        comments = CommentSerializer.setup_eager_loading(Comment.objects.filter(content_id=content_id))
+
+        return [
+            ('auth: connection by id', Connection.objects.select_related('user').filter(id=connection_id)[:1]),
+            ('auth: connections by user and age', Connection.objects.filter(user_id=user_id).order_by('-created_at')),
+            ('auth: expired connections', Connection.objects.filter(created_at__lt=timestamp - CONNECTION_LIFETIME)),
+
+            ('contents/details/<id>', contents.filter(id=content_id)),
+
+            ('contents/list/ count', Content.objects.values('id')),
+            ('contents/list/ ordering=created_at', contents.order_by('created_at')[:10]),
+            ('contents/list/ ordering=name', contents.order_by('name')[:10]),
+            ('contents/list/ ordering=-created_at', contents.order_by('-created_at')[:10]),
+            ('contents/list/ category ordering=created_at',
+             contents.filter(category='texture').order_by('created_at')[:10]),
+            ('contents/list/ cursor ordering=created_at', contents.filter(
+                keyset_filter('created_at', timestamp, content_id, False)
+            ).order_by('created_at', 'id')[:11]),
+            ('contents/list/ cursor ordering=name', contents.filter(
+                keyset_filter('name', 'm', content_id, False)
+            ).order_by('name', 'id')[:11]),
+            ('contents/list/ ordering=-trending_score', contents.order_by('-trending_score', '-id')[:11]),
+            ('contents/list/ category cursor ordering=-trending_score', contents.filter(
+                keyset_filter('trending_score', 1.0, content_id, True), category='texture'
+            ).order_by('-trending_score', '-id')[:11]),
+            ('update_trending: dirty contents', Content.objects.filter(
+                trending_dirty=True, id__gt=0
+            ).order_by('id').values_list('id', flat=True)[:1000]),
+
+            ('contents/changes', ContentChange.objects.filter(
+                id__gt=0, created_at__lte=timestamp
+            ).order_by('id').values_list('id', 'content_id', 'deleted')[:501]),
+            ('contents/changes: previous change', ContentChange.objects.filter(content_id=content_id)),
+
+            ('contents/search', search_contents(contents, 'pixel art').order_by('-rank', '-id')[:11]),
+
+            ('comments/<content_id>/list count', Comment.objects.filter(content_id=content_id).values('id')),
+            ('comments/<content_id>/list', comments.order_by('created_at')[:35]),
+            ('comments/<content_id>/list cursor', comments.filter(
+                keyset_filter('created_at', timestamp, 1, False)
+            ).order_by('created_at', 'id')[:36]),
+        ]
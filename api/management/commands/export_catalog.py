@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+from LostMinerCommunity import settings
+from api.utils.export import export_lines, get_export_queryset, gzip_stream
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta o catálogo em NDJSON (um conteúdo por linha), com o mesmo formato de `contents/export`, '
+        'lendo os conteúdos em lotes e com uso de memória constante.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=Path, help='Arquivo de saída (padrão: a saída padrão).')
+        parser.add_argument('--gzip', action='store_true', help='Comprime a saída com gzip.')
+        parser.add_argument('--comments', action='store_true', help='Inclui os comentários de cada conteúdo.')
+        parser.add_argument('--category', help='Exporta apenas os conteúdos da categoria.')
+        parser.add_argument('--created-after', help='Data ou data e hora ISO 8601 mínima de criação (inclusiva).')
+        parser.add_argument('--created-before', help='Data ou data e hora ISO 8601 máxima de criação (inclusiva).')
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.EXPORT_CHUNK_SIZE, help='Número de conteúdos por lote.'
+        )
+
+    def handle(self, *args, **options):
+        params = {
+            name: options[name] for name in ('category', 'created_after', 'created_before') if options[name]
+        }
+
+        try:
+            queryset = get_export_queryset(params)
+        except ValidationError as error:
+            raise CommandError(' '.join(f'{name}: {message}' for name, message in error.detail.items()))
+
+        stream = export_lines(queryset, comments=options['comments'], chunk_size=options['chunk_size'])
+
+        if options['gzip']:
+            stream = gzip_stream(stream)
+
+        output = options['output'].open('wb') if options['output'] else sys.stdout.buffer
+
+        try:
+            for chunk in stream:
+                output.write(chunk)
+        finally:
+            if options['output']:
+                output.close()
+            else:
+                output.flush()
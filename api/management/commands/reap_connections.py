@@ -0,0 +1,19 @@
+from LostMinerCommunity import settings
+from api.utils.security import reap_expired_connections
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Remove as conexões expiradas, em lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.CONNECTION_REAPER_BATCH_SIZE,
+            help='Número máximo de conexões removidas por consulta.'
+        )
+
+    def handle(self, *args, **options):
+        deleted = reap_expired_connections(options['batch_size'])
+
+        self.stdout.write(f'{deleted} expired connections removed.')
@@ -0,0 +1,15 @@
+from api.utils.activity import recount_comments
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o número de comentários e a data do último comentário de cada conteúdo, em lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Número de conteúdos por lote.')
+
+    def handle(self, *args, **options):
+        changed = recount_comments(options['batch_size'])
+
+        self.stdout.write(f'{changed} contents updated.')
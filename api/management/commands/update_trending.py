@@ -0,0 +1,18 @@
+from LostMinerCommunity import settings
+from api.utils.trending import update_trending_scores
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o `trending_score` dos conteúdos com atividade nova (`trending_dirty`), em lotes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TRENDING_BATCH_SIZE, help='Número de conteúdos por lote.'
+        )
+
+    def handle(self, *args, **options):
+        changed = update_trending_scores(options['batch_size'])
+
+        self.stdout.write(f'{changed} contents updated.')
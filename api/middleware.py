@@ -0,0 +1,93 @@
+from time import perf_counter
+
+from LostMinerCommunity import settings
+from api.utils import metrics
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+# Limites dos histogramas de número de consultas por requisição.
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class MetricsMiddleware:
+    """
+            Mede cada requisição: latência (`http_request_duration_seconds`), número de consultas e tempo
+        de banco (via `execute_wrapper`, veja `api.utils.metrics.query_timer`) e tempo gasto em serviços
+        externos, por view. As métricas são expostas em `/metrics` (`api.views.metrics`) e, com
+        `settings.METRICS_MULTIPROCESS_DIR`, gravadas periodicamente para serem somadas às dos outros workers.
+
+            Com `settings.SERVER_TIMING` (padrão: `DEBUG`), as medições também vão no cabeçalho
+        `Server-Timing` da resposta, visível nas ferramentas de desenvolvedor do navegador.
+
+            Deve ser o primeiro middleware, para que a latência inclua todos os demais.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        start = perf_counter()
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request.set(request_metrics)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+
+        return self.record(request, response, request_metrics, perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = perf_counter()
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current_request.set(request_metrics)
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+
+        return self.record(request, response, request_metrics, perf_counter() - start)
+
+    @staticmethod
+    def record(request, response, request_metrics: metrics.RequestMetrics, duration: float):
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else 'unmatched'
+
+        metrics.observe('http_request_duration_seconds', duration, view=view, method=request.method)
+        metrics.observe('http_request_db_queries', request_metrics.db_queries, buckets=QUERY_COUNT_BUCKETS, view=view)
+        metrics.increment('http_requests_total', view=view, method=request.method, status=response.status_code)
+        metrics.increment('db_queries_total', request_metrics.db_queries, view=view)
+        metrics.increment('db_query_duration_seconds_total', request_metrics.db_seconds, view=view)
+
+        for service, seconds in request_metrics.external_seconds.items():
+            metrics.increment('external_call_seconds_total', seconds, view=view, service=service)
+
+        if settings.SERVER_TIMING:
+            timings = [
+                f'db;dur={request_metrics.db_seconds * 1000:.1f};desc="{request_metrics.db_queries} queries"',
+                *(
+                    f'{service};dur={seconds * 1000:.1f}'
+                    for service, seconds in request_metrics.external_seconds.items()
+                ),
+                f'total;dur={duration * 1000:.1f}',
+            ]
+
+            if request_metrics.cache:
+                timings.insert(0, f'cache;desc="{request_metrics.cache}"')
+
+            response['Server-Timing'] = ', '.join(timings)
+
+        if settings.METRICS_MULTIPROCESS_DIR:
+            metrics.write_snapshot(settings.METRICS_MULTIPROCESS_DIR, settings.METRICS_SNAPSHOT_INTERVAL_SECONDS)
+
+        return response
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('username', models.CharField(max_length=50, unique=True)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('is_creator', models.BooleanField(default=False)),
+                ('password', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Content',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('category', models.CharField(choices=[('texture', 'Texture'), ('world', 'World'), ('skin', 'Skin')], max_length=20)),
+                ('version', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resolution', models.IntegerField(blank=True, null=True)),
+                ('download_url', models.URLField(unique=True)),
+                ('images_urls', models.JSONField(blank=True, default=dict)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.user')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Connection',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.user')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Comment',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('text', models.TextField()),
+                ('answering', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='api.comment')),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='api.content')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='comments', to='api.user')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='content',
+            constraint=models.UniqueConstraint(fields=('name', 'version'), name='unique_name_version'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    # Os índices da paginação por cursor ficam aqui, e não em 0001_initial, para que bancos criados antes das
+    # migrações (`migrate --fake-initial`) também os recebam.
+    operations = [
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['created_at', 'id'], name='content_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['name', 'id'], name='content_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['content', 'created_at', 'id'], name='comment_content_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='connection',
+            index=models.Index(fields=['user', 'created_at'], name='connection_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='connection',
+            index=models.Index(fields=['created_at'], name='connection_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['category', 'created_at'], name='content_category_created_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:28
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_stats(apps, schema_editor):
+    Content = apps.get_model('api', 'Content')
+    Comment = apps.get_model('api', 'Comment')
+
+    comments = Comment.objects.filter(content=OuterRef('pk')).order_by().values('content')
+
+    Content.objects.update(
+        comment_count=Coalesce(
+            Subquery(comments.annotate(total=Count('id')).values('total'), output_field=IntegerField()),
+            Value(0)
+        ),
+        last_comment_at=Subquery(comments.annotate(last=Max('created_at')).values('last')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='content',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['comment_count', 'id'], name='content_comment_count_idx'),
+        ),
+        migrations.RunPython(fill_comment_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+POSTGRESQL_FORWARD = [
+    """
+    CREATE INDEX content_search_idx ON api_content
+    USING GIN (to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, '')))
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP INDEX IF EXISTS content_search_idx',
+]
+
+# Tabela FTS5 com conteúdo externo (`api_content`), sincronizada por triggers.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE api_content_fts USING fts5(
+        name, description, content='api_content', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER api_content_fts_insert AFTER INSERT ON api_content BEGIN
+        INSERT INTO api_content_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_content_fts_delete AFTER DELETE ON api_content BEGIN
+        INSERT INTO api_content_fts(api_content_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER api_content_fts_update AFTER UPDATE OF name, description ON api_content BEGIN
+        INSERT INTO api_content_fts(api_content_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO api_content_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO api_content_fts(api_content_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS api_content_fts_insert',
+    'DROP TRIGGER IF EXISTS api_content_fts_delete',
+    'DROP TRIGGER IF EXISTS api_content_fts_update',
+    'DROP TABLE IF EXISTS api_content_fts',
+]
+
+
+def run_statements(statements: dict):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+        Índice de busca textual sobre `Content.name` e `Content.description` (`api.utils.search`):
+        GIN sobre `to_tsvector` no PostgreSQL e uma tabela FTS5 no SQLite.
+    """
+
+    dependencies = [
+        ('api', '0004_content_comment_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_statements({'postgresql': POSTGRESQL_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run_statements({'postgresql': POSTGRESQL_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_content_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['category', 'resolution', 'version'], name='content_cat_res_version_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['version'], name='content_version_pattern_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
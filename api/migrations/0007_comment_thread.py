@@ -0,0 +1,47 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_thread(apps, schema_editor):
+    Comment = apps.get_model('api', 'Comment')
+
+    parents = Comment.objects.filter(pk=OuterRef('answering'))
+
+    # Um nível da árvore por iteração: respostas cujo comentário respondido já tem `root` definido
+    # (ou é de primeiro nível).
+    while Comment.objects.filter(answering__isnull=False, root__isnull=True).filter(
+        Q(answering__answering__isnull=True) | Q(answering__root__isnull=False)
+    ).update(
+        root=Subquery(parents.values(value=Coalesce(F('root'), F('id')))),
+        depth=Subquery(parents.values(value=F('depth') + 1)),
+    ):
+        pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_content_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='root',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='thread', to='api.comment'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['content', 'depth', 'created_at', 'id'], name='comment_content_depth_idx'),
+        ),
+        migrations.RunPython(fill_comment_thread, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_comment_thread'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='downloads_count',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='content',
+            name='views_count',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_content_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='trending_dirty',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='content',
+            name='trending_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['trending_score', 'id'], name='content_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['category', 'trending_score', 'id'], name='content_category_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(condition=models.Q(('trending_dirty', True)), fields=['id'], name='content_trending_dirty_idx'),
+        ),
+    ]
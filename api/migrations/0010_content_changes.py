@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-17 19:58
+
+from django.db import migrations, models
+
+
+def fill_content_changes(apps, schema_editor):
+    # Um registro por conteúdo existente, para que uma sincronização a partir de `since=0` receba o catálogo inteiro.
+    Content = apps.get_model('api', 'Content')
+    ContentChange = apps.get_model('api', 'ContentChange')
+
+    batch = []
+
+    for content_id in Content.objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=2000):
+        batch.append(ContentChange(content_id=content_id))
+
+        if len(batch) == 2000:
+            ContentChange.objects.bulk_create(batch)
+            batch = []
+
+    ContentChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_content_trending'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('content_id', models.IntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['content_id'], name='content_change_content_idx')],
+            },
+        ),
+        migrations.RunPython(fill_content_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+from django.db import migrations
+
+# No SQLite, `0008_content_counters` recria a tabela `api_content` (campos com CHECK), o que remove os
+# triggers que mantêm a tabela FTS5 de `0005_content_search` sincronizada. Eles são recriados aqui, e o
+# índice é reconstruído com os conteúdos gravados desde então.
+SQLITE_FORWARD = [
+    """
+    CREATE TRIGGER IF NOT EXISTS api_content_fts_insert AFTER INSERT ON api_content BEGIN
+        INSERT INTO api_content_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_content_fts_delete AFTER DELETE ON api_content BEGIN
+        INSERT INTO api_content_fts(api_content_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_content_fts_update AFTER UPDATE OF name, description ON api_content BEGIN
+        INSERT INTO api_content_fts(api_content_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO api_content_fts(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO api_content_fts(api_content_fts) VALUES ('rebuild')",
+]
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for statement in SQLITE_FORWARD:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    """
+        Recria, no SQLite, os triggers da busca textual removidos pela recriação da tabela `api_content`.
+        Uma migração futura que recrie a tabela precisa fazer o mesmo.
+    """
+
+    dependencies = [
+        ('api', '0010_content_changes'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
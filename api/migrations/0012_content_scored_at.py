@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-17 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_content_fts_triggers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='scored_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
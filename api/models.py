@@ -8,6 +8,14 @@ class Connection(Model):
     created_at = DateTimeField(auto_now_add=True)
     user = ForeignKey('api.User', on_delete=CASCADE)
 
+    class Meta:
+        indexes = [
+            # Conexões de um usuário por idade (limite de conexões ativas por usuário).
+            Index(fields=['user', 'created_at'], name='connection_user_created_idx'),
+            # Remoção das conexões expiradas.
+            Index(fields=['created_at'], name='connection_created_idx'),
+        ]
+
 
 class User(Model):
     id = AutoField(primary_key=True)
@@ -26,11 +34,28 @@ class Comment(Model):
     id = AutoField(primary_key=True)
     content = ForeignKey('api.Content', on_delete=CASCADE, related_name='comments')
     created_at = DateTimeField(auto_now_add=True)
+    updated_at = DateTimeField(auto_now=True)
     author = ForeignKey('api.User', on_delete=PROTECT, related_name='comments')
     text = TextField()
     answering = ForeignKey('api.Comment', on_delete=CASCADE, blank=True, null=True, related_name='answers')
 
+    # Comentário de primeiro nível da discussão (nulo nele mesmo) e nível da resposta (0 no primeiro nível),
+    # para carregar uma discussão inteira com uma consulta (`comments/<content_id>/tree`).
+    root = ForeignKey('api.Comment', on_delete=CASCADE, blank=True, null=True, related_name='thread')
+    depth = PositiveSmallIntegerField(default=0)
+
     answers: QuerySet[Comment]
+    thread: QuerySet[Comment]
+
+    class Meta:
+        indexes = [
+            # Listagem paginada por cursor dos comentários de um conteúdo.
+            Index(fields=['content', 'created_at', 'id'], name='comment_content_created_idx'),
+            # Última alteração dos comentários de um conteúdo (ETag / Last-Modified).
+            Index(fields=['content', 'updated_at'], name='comment_content_updated_idx'),
+            # Comentários de primeiro nível (`depth = 0`) de um conteúdo, paginados por cursor.
+            Index(fields=['content', 'depth', 'created_at', 'id'], name='comment_content_depth_idx'),
+        ]
 
 
 class Content(Model):
@@ -47,17 +72,74 @@ class Content(Model):
     category = CharField(max_length=20, choices=category_choices)
     version = CharField(max_length=100)
     created_at = DateTimeField(auto_now_add=True)
+    updated_at = DateTimeField(auto_now=True)
     resolution = IntegerField(null=True, blank=True)
     download_url = URLField(unique=True)
     images_urls = JSONField(default=dict, blank=True)
 
+    # Mantidos pelas views de comentários (`api.utils.activity`).
+    comment_count = PositiveIntegerField(default=0)
+    last_comment_at = DateTimeField(null=True, blank=True)
+
+    # Acumulados em memória e gravados em lote (`api.utils.counters`); não alteram `updated_at`. Os novos
+    # valores passam a mudar o ETag quando o `update_trending` recalcula o score (`scored_at`).
+    views_count = PositiveBigIntegerField(default=0)
+    downloads_count = PositiveBigIntegerField(default=0)
+
+    # Posição em `ordering=-trending_score` (`api.utils.trending`). `trending_dirty` marca os conteúdos com
+    # atividade nova, os únicos recalculados pelo `update_trending_scores`, e `scored_at` guarda quando o
+    # score mudou pela última vez (entra no ETag sem alterar o `updated_at`).
+    trending_score = FloatField(default=0)
+    trending_dirty = BooleanField(default=True)
+    scored_at = DateTimeField(null=True, blank=True)
+
     comments: QuerySet[Comment]
 
     class Meta:
         constraints = [
             UniqueConstraint(fields=['name', 'version'], name='unique_name_version')
         ]
+        indexes = [
+            # Chaves da paginação por cursor de `contents/list/`.
+            Index(fields=['created_at', 'id'], name='content_created_id_idx'),
+            Index(fields=['name', 'id'], name='content_name_id_idx'),
+            # Listagens de uma categoria por data de criação.
+            Index(fields=['category', 'created_at'], name='content_category_created_idx'),
+            # Última alteração do catálogo (ETag / Last-Modified).
+            Index(fields=['updated_at'], name='content_updated_idx'),
+            # Ordenação por "mais comentados".
+            Index(fields=['comment_count', 'id'], name='content_comment_count_idx'),
+            # Filtros de `contents/list/` (`api.utils.filters`): categoria e resolução exatas com prefixo da versão.
+            Index(fields=['category', 'resolution', 'version'], name='content_cat_res_version_idx'),
+            # Prefixo da versão (`LIKE 'x%'`); a classe de operadores só se aplica ao PostgreSQL.
+            Index(fields=['version'], name='content_version_pattern_idx', opclasses=['varchar_pattern_ops']),
+            # Ordenação "em alta" (`-trending_score`), geral e por categoria.
+            Index(fields=['trending_score', 'id'], name='content_trending_idx'),
+            Index(fields=['category', 'trending_score', 'id'], name='content_category_trending_idx'),
+            # Conteúdos com atividade ainda não considerada no `trending_score`.
+            Index(fields=['id'], condition=Q(trending_dirty=True), name='content_trending_dirty_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+
+
+class ContentChange(Model):
+    """
+            Registro de alteração de um conteúdo, lido pelo `contents/changes` (`api.utils.changes`).
+
+            O `id` é a marca d'água do feed. Cada conteúdo tem no máximo um registro, o da última alteração:
+        registrar uma nova alteração remove a anterior. Remoções deixam um registro com `deleted` (tombstone),
+        por isso `content_id` não é uma chave estrangeira.
+    """
+    id = BigAutoField(primary_key=True)
+    content_id = IntegerField()
+    deleted = BooleanField(default=False)
+    created_at = DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Substituição do registro anterior do mesmo conteúdo.
+            Index(fields=['content_id'], name='content_change_content_idx'),
+        ]
@@ -0,0 +1,58 @@
+from api.models import Connection, Content, User
+from api.utils.response_cache import invalidate_content
+from api.utils.changes import record_content_changes
+from api.utils.security import invalidate_connection, invalidate_user_connections
+from api.utils.metrics import query_timer
+from api.utils.activity import register_username_changed
+
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+
+@receiver(post_delete, sender=Connection)
+def connection_deleted(sender, instance: Connection, **kwargs):
+    invalidate_connection(instance.id)
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance: User, raw: bool = False, update_fields=None, **kwargs):
+    if raw or instance.pk is None or (update_fields is not None and 'username' not in update_fields):
+        return
+
+    previous = User.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+    instance._username_changed = previous is not None and previous != instance.username
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance: User, **kwargs):
+    invalidate_user_connections(instance.id)
+
+    # O `username` aparece nas respostas dos conteúdos e comentários do usuário.
+    if getattr(instance, '_username_changed', False):
+        instance._username_changed = False
+        register_username_changed(instance.id)
+
+
+@receiver(post_save, sender=Content)
+@receiver(post_delete, sender=Content)
+def content_changed(sender, instance: Content, **kwargs):
+    invalidate_content(instance.id)
+
+
+@receiver(post_save, sender=Content)
+def content_saved(sender, instance: Content, raw: bool = False, **kwargs):
+    if not raw:
+        record_content_changes([instance.id])
+
+
+@receiver(post_delete, sender=Content)
+def content_deleted(sender, instance: Content, **kwargs):
+    record_content_changes([instance.id], deleted=True)
+
+
+@receiver(connection_created)
+def install_query_timer(sender, connection, **kwargs):
+    # O sinal é enviado a cada (re)conexão do mesmo `DatabaseWrapper`.
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
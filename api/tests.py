@@ -1,3 +1,358 @@
-from django.test import TestCase
+import json
+import re
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from api.management.commands.explain_queries import Command as ExplainQueriesCommand
+from LostMinerCommunity import settings
+from api.models import Comment, Content, User
+from api.views.asynchronous import AsyncGetContentView, AsyncListCommentsView, AsyncPaginationContentView
+from api.utils.benchmark import local_services
+from api.utils.fast_serializers import CommentValuesSerializer, ContentValuesSerializer, get_values_serializer
+from api.utils.filters import ContentFilterBackend
+from api.utils.renderers import FastJSONRenderer
+from api.utils.response_cache import get_response_cache, invalidate_content
+from api.utils.security import connection_cache, create_connection, create_token, get_connection_from_token
+from api.utils.serializers import CommentSerializer, ContentSerializer
+from api.utils.testing import assert_num_queries
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase
+from django.utils.timezone import now
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+
+class CatalogTestCase(TestCase):
+    """
+        Catálogo de exemplo: conteúdos de autores diferentes, com comentários e respostas, para que
+        as consultas por página não dependam de haver um único autor ou comentário.
+    """
+    contents_count = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create(username=f'user{index}', email=f'user{index}@example.com')
+            for index in range(5)
+        ]
+        cls.contents = [
+            Content.objects.create(
+                name=f'content {index}', author=cls.users[index % len(cls.users)], category='texture',
+                version=f'1.{index % 3}', resolution=16 << (index % 3), download_url=f'https://example.com/{index}'
+            )
+            for index in range(cls.contents_count)
+        ]
+        cls.content = cls.contents[0]
+
+        for index, user in enumerate(cls.users):
+            comment = Comment.objects.create(content=cls.content, author=user, text=f'comment {index}')
+            Comment.objects.create(
+                content=cls.content, author=cls.users[-1 - index], text=f'answer {index}',
+                answering=comment, root=comment, depth=1
+            )
+
+    def setUp(self):
+        # Conexões e respostas guardadas por um teste anterior mudariam o número de consultas.
+        connection_cache.clear()
+        get_response_cache().clear()
+
+        self.authorization = f'Bearer {create_token(create_connection(self.users[0].id))}'
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=self.authorization)
+
+
+class QueryCountTests(CatalogTestCase):
+    """
+        Número de consultas por requisição das listagens e do detalhe, que não deve crescer com o
+        tamanho da página (`setup_eager_loading` dos serializers).
+    """
+
+    def test_content_list(self):
+        # ETag (MAX/COUNT), COUNT da paginação e a página; a conexão já está em cache (`create_connection`).
+        with assert_num_queries(3):
+            response = self.client.get('/api/contents/list/', {'page_size': self.contents_count})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), self.contents_count)
+
+    def test_content_list_cursor(self):
+        # ETag (as linhas da página) e a página, sem COUNT.
+        with assert_num_queries(2):
+            response = self.client.get('/api/contents/list/', {'cursor': '', 'page_size': self.contents_count})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), self.contents_count)
+
+    def test_content_details(self):
+        # ETag e o conteúdo com o autor.
+        with assert_num_queries(2):
+            response = self.client.get(f'/api/contents/details/{self.content.id}')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['author']['username'], self.content.author.username)
+
+    def test_comment_list(self):
+        # ETag, COUNT da paginação e a página, com os autores e os comentários respondidos.
+        with assert_num_queries(3):
+            response = self.client.get(f'/api/comments/{self.content.id}/list')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 2 * len(self.users))
+
+    def test_comment_tree(self):
+        # ETag, os comentários de primeiro nível (por cursor) e as respostas.
+        with assert_num_queries(3):
+            response = self.client.get(f'/api/comments/{self.content.id}/tree')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), len(self.users))
+
+    def test_not_modified(self):
+        etag = self.client.get('/api/contents/list/', {'cursor': ''})['ETag']
+
+        # Apenas o ETag: a página não é lida.
+        with assert_num_queries(1):
+            response = self.client.get('/api/contents/list/', {'cursor': ''}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+
+@skipUnless(
+    connection.vendor == 'sqlite',
+    'Os planos esperados são os do SQLite; no PostgreSQL, use `explain_queries --check` com dados.'
+)
+class QueryPlanTests(CatalogTestCase):
+    """
+        Índices usados pelos filtros de `contents/list/` (`api.utils.filters`), pelas mesmas consultas de
+        `manage.py explain_queries`.
+    """
+    # Filtros (como nomeados por `explain_queries`) -> índices aceitos para a leitura de `api_content`
+    # (por prefixo: o índice da chave estrangeira `author` tem um sufixo gerado pelo Django).
+    expected_indexes = {
+        'category=texture': ('content_category_created_idx',),
+        'version=1.20': ('content_version_pattern_idx',),
+        'category=texture version=1.20': ('content_category_created_idx', 'content_cat_res_version_idx'),
+        'category=texture resolution=16': ('content_category_created_idx', 'content_cat_res_version_idx'),
+        'category=texture resolution=16 version=1.20': ('content_cat_res_version_idx',),
+        'category=texture resolution_min=16 resolution_max=64': ('content_cat_res_version_idx',),
+        'category=texture resolution_min=16 resolution_max=64 version=1.20': ('content_cat_res_version_idx',),
+        'author=1': ('api_content_author_id',),
+        'author=1 category=texture': ('content_category_created_idx', 'api_content_author_id'),
+    }
+
+    def test_filters_use_expected_indexes(self):
+        queries = ExplainQueriesCommand.get_filter_queries()
+
+        self.assertEqual(
+            {name.removeprefix('contents/list/ ') for name, _ in queries}, set(self.expected_indexes)
+        )
+
+        for name, queryset in queries:
+            with self.subTest(name):
+                plan = queryset.explain()
+                indexes = re.findall(rf'{Content._meta.db_table} USING (?:COVERING )?INDEX (\w+)', plan)
+
+                self.assertFalse(ExplainQueriesCommand.is_full_scan(plan, Content._meta.db_table), plan)
+                self.assertTrue(indexes, plan)
+                self.assertTrue(
+                    indexes[0].startswith(self.expected_indexes[name.removeprefix('contents/list/ ')]), plan
+                )
+
+    def test_explain_queries_check(self):
+        call_command('explain_queries', check=True, stdout=StringIO())
+
+
+class ContentFilterTests(CatalogTestCase):
+    """
+        Validação dos parâmetros de `ContentFilterBackend`, usado pela listagem, pela busca e pela exportação.
+    """
+
+    def test_out_of_range_integer_filters(self):
+        for param in ContentFilterBackend.integer_params:
+            for value in (str(2 ** 63), str(-2 ** 63 - 1), '99999999999999999999'):
+                with self.subTest(param=param, value=value):
+                    response = self.client.get('/api/contents/list/', {param: value})
+
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn(param, response.json())
+
+        self.assertEqual(self.client.get('/api/contents/list/', {'author': str(2 ** 63 - 1)}).status_code, 200)
+
+
+class ValuesSerializerTests(CatalogTestCase):
+    """
+        Saída do caminho rápido (`ValuesSerializer` + `FastJSONRenderer`) idêntica à dos serializers e do
+        renderer do DRF.
+    """
+    float_cases = [1e-6, 2.5e-5, 0.0001, 1e16, 1.5e22, -3.25e-7, 5e-324, 123.456, 0.1]
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+
+        # Campos nulos, JSON aninhado, texto fora do ASCII e separadores de linha que o renderer escapa.
+        Content.objects.filter(id=cls.content.id).update(
+            description='Texturas em alta resolução \u2028 ☃', images_urls={'cover': ['https://example.com/a.png']},
+            last_comment_at=now(), comment_count=2 * len(cls.users), trending_score=1.5
+        )
+        Content.objects.filter(id=cls.contents[1].id).update(description=None, resolution=None, images_urls={})
+
+        # Scores que o orjson e o `json` formatam de formas diferentes (expoentes e valores menores que 1e-4).
+        for content, score in zip(cls.contents[2:], cls.float_cases):
+            Content.objects.filter(id=content.id).update(trending_score=score)
+
+    def assert_same_output(self, queryset, serializer_class, values_serializer_class):
+        expected = serializer_class(serializer_class.setup_eager_loading(queryset), many=True).data
+        values_serializer = get_values_serializer(values_serializer_class)
+        actual = values_serializer.serialize(values_serializer.values(serializer_class.setup_eager_loading(queryset)))
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(FastJSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_renderer_floats(self):
+        data = {'scores': self.float_cases, 'text': 'score: 1e-6, 0.00001'}
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_content_values_serializer(self):
+        self.assert_same_output(Content.objects.order_by('id'), ContentSerializer, ContentValuesSerializer)
+
+    def test_comment_values_serializer(self):
+        self.assert_same_output(
+            Comment.objects.filter(content=self.content).order_by('id'), CommentSerializer, CommentValuesSerializer
+        )
+
+    def test_views_use_values_serializer(self):
+        # A listagem (caminho rápido) e o detalhe (serializer do DRF) devem representar o conteúdo da mesma forma.
+        listed = self.client.get('/api/contents/list/', {'page_size': self.contents_count}).json()['results']
+        detail = self.client.get(f'/api/contents/details/{self.content.id}').json()
+
+        self.assertEqual(next(content for content in listed if content['id'] == self.content.id), detail)
+
+
+class ContentCacheTests(CatalogTestCase):
+    """
+        Toda escrita em um conteúdo deve mudar o ETag do detalhe e deixar de servir a resposta em cache.
+    """
+
+    def test_upload_images_changes_details(self):
+        url = f'/api/contents/details/{self.content.id}'
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        with TemporaryDirectory() as image_root, local_services(Path(image_root)):
+            response = self.client.post(
+                f'/api/contents/upload_images/{self.content.id}',
+                {'cover': SimpleUploadedFile('cover.png', b'image', content_type='image/png')},
+                format='multipart'
+            )
+
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('cover', response.json()['images_urls'])
+
+    def test_invalidate_content_discards_responses(self):
+        url = f'/api/contents/details/{self.content.id}'
+
+        self.client.get(url)
+        self.client.get('/api/contents/list/')
+
+        # Só após o commit; o ETag não muda, então o descarte vem apenas da invalidação.
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_content(self.content.id)
+
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/contents/list/')['X-Cache'], 'MISS')
+
+
+class BulkContentTests(CatalogTestCase):
+
+    def test_invalid_ids(self):
+        items = [{'id': [1]}, {'id': {}}, {'id': True}, {'id': 2 ** 63}, {'id': self.content.id, 'name': 'renamed'}]
+
+        response = self.client.post('/api/contents/bulk', items, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [{'id': ['A valid integer is required.']}] * 4 + [{}])
+
+
+class AsyncViewTests(CatalogTestCase):
+    """
+        Status e corpo das views assíncronas (`ASYNC_READ_VIEWS`) iguais aos das views síncronas.
+    """
+
+    def assert_same_response(self, view_class, path: str, params: dict = None, **kwargs):
+        expected = self.client.get(path, params)
+        request = AsyncRequestFactory().get(path, params, headers={'Authorization': self.authorization})
+
+        response = async_to_sync(view_class.as_view())(request, **kwargs)
+
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), expected.json())
+
+    def test_validation_error(self):
+        self.assert_same_response(AsyncPaginationContentView, '/api/contents/list/', {'category': 'bad'})
+
+    def test_not_found(self):
+        missing = max(content.id for content in self.contents) + 1
+
+        self.assert_same_response(AsyncGetContentView, f'/api/contents/details/{missing}', id=missing)
+        self.assert_same_response(
+            AsyncListCommentsView, f'/api/comments/{self.content.id}/list', {'cursor': 'bad'},
+            content_id=self.content.id
+        )
+
+    def test_success(self):
+        self.assert_same_response(AsyncPaginationContentView, '/api/contents/list/', {'page_size': 5})
+
+
+class ConnectionTests(CatalogTestCase):
+
+    def test_refreshed_token_is_revoked(self):
+        for stateless in (False, True):
+            with self.subTest(stateless=stateless), patch.object(settings, 'JWT_STATELESS_VERIFICATION', stateless):
+                self.setUp()
+                connection_cache.clear()
+
+                response = self.client.put('/api/auth/refresh_token')
+
+                self.assertEqual(response.status_code, 200)
+
+                # Em outro worker, sem a conexão no `connection_cache`.
+                connection_cache.clear()
+
+                self.assertEqual(self.client.put('/api/auth/refresh_token').status_code, 403)
+                self.assertEqual(
+                    self.client.post(f'/api/comments/{self.content.id}/create', {'text': 'hi'}).status_code, 403
+                )
+
+                self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+                connection_cache.clear()
+
+                self.assertEqual(
+                    self.client.post(f'/api/comments/{self.content.id}/create', {'text': 'hi'}).status_code, 201
+                )
+
+    def test_stateless_token_skips_database(self):
+        # Sem invalidações anteriores (de outros testes, com os mesmos IDs) no cache compartilhado.
+        caches[settings.CONNECTION_REVOCATION_CACHE_ALIAS].clear()
+        connection_cache.clear()
+
+        with patch.object(settings, 'JWT_STATELESS_VERIFICATION', True), assert_num_queries(0):
+            connection = get_connection_from_token(self.authorization.removeprefix('Bearer '))
+
+        self.assertEqual(connection.user_id, self.users[0].id)
@@ -1,5 +1,16 @@
 from django.urls import path
-from api.views import auth, content, comment
+from LostMinerCommunity import settings
+from api.views import auth, content, comment, asynchronous
+
+# Versões assíncronas das views de leitura, para execução sob ASGI (`LostMinerCommunity.asgi`).
+if settings.ASYNC_READ_VIEWS:
+    get_content_view = asynchronous.AsyncGetContentView
+    pagination_view = asynchronous.AsyncPaginationContentView
+    list_comments_view = asynchronous.AsyncListCommentsView
+else:
+    get_content_view = content.GetContentView
+    pagination_view = content.PaginationContentView
+    list_comments_view = comment.ListCommentsView
 
 
 urlpatterns = [
@@ -10,14 +21,20 @@ urlpatterns = [
     path('auth/refresh_token', auth.RefreshToken.as_view(), name='refresh_token'),
 
     path('contents/create', content.CreateContentView.as_view(), name='create_content'),
-    path('contents/details/<int:id>', content.GetContentView.as_view(), name='get_content'),
-    path('contents/list/', content.PaginationContentView.as_view(), name='pagination'),
+    path('contents/bulk', content.BulkContentView.as_view(), name='bulk_contents'),
+    path('contents/details/<int:id>', get_content_view.as_view(), name='get_content'),
+    path('contents/download/<int:id>', content.DownloadContentView.as_view(), name='download_content'),
+    path('contents/list/', pagination_view.as_view(), name='pagination'),
+    path('contents/search', content.SearchContentsView.as_view(), name='search_contents'),
+    path('contents/changes', content.ContentChangesView.as_view(), name='content_changes'),
+    path('contents/export', content.ExportContentsView.as_view(), name='export_contents'),
     path('contents/edit/<int:id>', content.UpdateContentView.as_view(), name='update_content'),
     path('contents/delete/<int:id>', content.DeleteContentView.as_view(), name='delete_content'),
     path('contents/upload_images/<int:id>', content.UploadImagesView.as_view(), name='upload_images'),
 
     path('comments/<int:content_id>/create', comment.CreateCommentView.as_view(), name='create_comment'),
-    path('comments/<int:content_id>/list', comment.ListCommentsView.as_view(), name='list_comments'),
+    path('comments/<int:content_id>/list', list_comments_view.as_view(), name='list_comments'),
+    path('comments/<int:content_id>/tree', comment.CommentTreeView.as_view(), name='comment_tree'),
     path('comments/edit/<int:id>', comment.UpdateCommentView.as_view(), name='update_comment'),
     path('comments/delete/<int:id>', comment.DeleteComment.as_view(), name='delete_comment'),
 ]
\ No newline at end of file
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from api.models import Comment, Content
+from api.utils.response_cache import invalidate_content
+from api.utils.changes import record_content_changes
+
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils.timezone import now
+
+
+def _comment_stats_subqueries() -> dict:
+    comments = Comment.objects.filter(content=OuterRef('pk')).order_by().values('content')
+
+    return {
+        'comment_count': Coalesce(
+            Subquery(comments.annotate(total=Count('id')).values('total'), output_field=IntegerField()),
+            Value(0)
+        ),
+        'last_comment_at': Subquery(comments.annotate(last=Max('created_at')).values('last')),
+    }
+
+
+def register_comment_created(content_id: int, created_at: datetime):
+    """
+        Atualiza `comment_count` e `last_comment_at` do conteúdo após a criação de um comentário.
+        Deve ser chamada na mesma transação da criação.
+    """
+    Content.objects.filter(id=content_id).update(
+        comment_count=F('comment_count') + 1,
+        last_comment_at=created_at,
+        trending_dirty=True,
+        updated_at=now()
+    )
+
+    record_content_changes([content_id])
+    invalidate_content(content_id)
+
+
+def register_comments_deleted(content_id: int, deleted: int):
+    """
+            Atualiza `comment_count` e `last_comment_at` do conteúdo após a remoção de `deleted` comentários
+        (o comentário removido e as respostas removidas em cascata). Deve ser chamada na mesma transação
+        da remoção.
+    """
+    Content.objects.filter(id=content_id).update(
+        comment_count=Greatest(F('comment_count') - deleted, Value(0)),
+        last_comment_at=_comment_stats_subqueries()['last_comment_at'],
+        trending_dirty=True,
+        updated_at=now()
+    )
+
+    record_content_changes([content_id])
+    invalidate_content(content_id)
+
+
+def register_username_changed(user_id: int):
+    """
+            Atualiza o `updated_at` dos conteúdos e comentários que exibem o `username` do usuário (como autor,
+        ou como autor do comentário respondido), para que os ETags, as respostas em cache e o feed de
+        alterações reflitam o novo nome. Deve ser chamada na mesma transação da alteração.
+    """
+    timestamp = now()
+    content_ids = list(Content.objects.filter(author_id=user_id).values_list('id', flat=True))
+
+    Content.objects.filter(id__in=content_ids).update(updated_at=timestamp)
+    Comment.objects.filter(Q(author_id=user_id) | Q(answering__author_id=user_id)).update(updated_at=timestamp)
+
+    record_content_changes(content_ids)
+
+    for content_id in content_ids:
+        invalidate_content(content_id)
+
+
+def recount_comments(batch_size: int = 1000) -> int:
+    """
+        Recalcula `comment_count` e `last_comment_at` de todos os conteúdos, em lotes de `batch_size` IDs.
+
+        Retorna:
+            int: O número de conteúdos cujos valores mudaram.
+    """
+    changed = 0
+    last_id = 0
+
+    while True:
+        ids = list(
+            Content.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+
+        if not ids:
+            return changed
+
+        stats = _comment_stats_subqueries()
+        rows = (
+            Content.objects
+            .filter(id__in=ids)
+            .annotate(actual_count=stats['comment_count'], actual_last=stats['last_comment_at'])
+            .values_list('id', 'comment_count', 'last_comment_at', 'actual_count', 'actual_last')
+        )
+
+        # Só os conteúdos divergentes são atualizados, para não alterar o `updated_at` (e o ETag) dos demais.
+        stale = [
+            content_id for content_id, count, last, actual_count, actual_last in rows
+            if (count, last) != (actual_count, actual_last)
+        ]
+
+        if stale:
+            with transaction.atomic():
+                Content.objects.filter(id__in=stale).update(**stats, trending_dirty=True, updated_at=now())
+                record_content_changes(stale)
+
+                for content_id in stale:
+                    invalidate_content(content_id)
+
+            changed += len(stale)
+
+        last_id = ids[-1]
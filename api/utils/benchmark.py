@@ -0,0 +1,82 @@
+from contextlib import contextmanager
+from math import ceil
+from pathlib import Path
+
+from LostMinerCommunity import settings
+from api.utils.storage import get_image_storage
+
+from django.db import transaction
+from django.test.utils import override_settings
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back(using: str = None):
+    """
+        Executa o bloco dentro de uma transação que é sempre desfeita ao final,
+        para que os dados gerados por um benchmark não permaneçam no banco.
+    """
+    try:
+        with transaction.atomic(using=using):
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    """
+        Percentil `percent` (0-100) de `samples` pelo método do posto mais próximo.
+    """
+    if not samples:
+        return 0.0
+
+    ordered = sorted(samples)
+    rank = max(ceil(percent / 100 * len(ordered)), 1)
+
+    return ordered[rank - 1]
+
+
+def summarize(samples: list[float]) -> dict:
+    """
+        Resumo das latências (em segundos) em milissegundos: p50, p95, p99 e máximo.
+    """
+    return {
+        'p50': percentile(samples, 50) * 1000,
+        'p95': percentile(samples, 95) * 1000,
+        'p99': percentile(samples, 99) * 1000,
+        'max': max(samples, default=0.0) * 1000,
+    }
+
+
+@contextmanager
+def local_services(image_root: Path):
+    """
+        Substitui os serviços externos por equivalentes locais durante o bloco: os e-mails são entregues de
+        forma síncrona ao backend `locmem` (`django.core.mail.outbox`) e as imagens são gravadas em `image_root`
+        pelo `LocalImageStorage`, no lugar do SMTP e do Cloudinary. As métricas ficam apenas no processo.
+    """
+    values = {
+        'MAIL_QUEUE_WORKERS': 0,
+        'METRICS_MULTIPROCESS_DIR': '',
+        'IMAGE_STORAGE_BACKEND': 'api.utils.storage.LocalImageStorage',
+        'IMAGE_STORAGE_LOCAL_ROOT': Path(image_root),
+    }
+    previous = {name: getattr(settings, name) for name in values}
+
+    for name, value in values.items():
+        setattr(settings, name, value)
+
+    get_image_storage.cache_clear()
+
+    try:
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+        get_image_storage.cache_clear()
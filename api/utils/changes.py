@@ -0,0 +1,49 @@
+from datetime import timedelta
+from typing import Iterable
+
+from LostMinerCommunity import settings
+from api.models import ContentChange
+
+from django.utils.timezone import now
+
+
+def record_content_changes(content_ids: Iterable[int], deleted: bool = False):
+    """
+            Registra a criação, alteração ou remoção (`deleted`) dos conteúdos no feed do `contents/changes`,
+        substituindo os registros anteriores dos mesmos conteúdos. Deve ser chamada na mesma transação da escrita.
+    """
+    content_ids = list(dict.fromkeys(content_ids))
+
+    if not content_ids:
+        return
+
+    ContentChange.objects.filter(content_id__in=content_ids).delete()
+    ContentChange.objects.bulk_create([
+        ContentChange(content_id=content_id, deleted=deleted) for content_id in content_ids
+    ])
+
+
+def get_content_changes(since: int, limit: int) -> tuple[list[tuple[int, int, bool]], bool]:
+    """
+            Alterações posteriores à marca d'água `since`, em ordem, ignorando as mais recentes que
+        `CONTENT_CHANGES_SAFETY_LAG_SECONDS`.
+
+            O atraso é uma heurística, e não uma garantia: o `created_at` é o momento da inserção, e não o do
+        commit. Uma transação que continue aberta por mais que o atraso depois de gravar a alteração pode
+        confirmar um `id` menor que a marca d'água já entregue a um cliente, que não a recebe. O atraso deve
+        ser maior que a duração da transação de escrita mais longa; um espelho que precise de uma cópia exata
+        pode refazer a sincronização a partir de `since=0`.
+
+        Retorna:
+            tuple: As alterações (`id`, `content_id`, `deleted`) e se existem outras após elas.
+    """
+    horizon = now() - timedelta(seconds=settings.CONTENT_CHANGES_SAFETY_LAG_SECONDS)
+
+    changes = list(
+        ContentChange.objects
+        .filter(id__gt=since, created_at__lte=horizon)
+        .order_by('id')
+        .values_list('id', 'content_id', 'deleted')[:limit + 1]
+    )
+
+    return changes[:limit], len(changes) > limit
@@ -0,0 +1,153 @@
+from datetime import datetime
+from hashlib import sha1
+from typing import Optional
+
+from api.utils.pagination import KeysetPagination
+
+from django.db.models import Count, Max, QuerySet
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+            Suporte a GET condicional (`ETag` / `Last-Modified`) para as views de leitura.
+
+            Os validadores vêm de uma consulta barata sobre os registros da resposta, sem serializar nada.
+        Na paginação por cursor, são lidos apenas o `id` e as colunas de `conditional_fields` (por padrão,
+        `updated_at`) das linhas da página pedida (o mesmo intervalo do índice que a página usa); nas demais
+        views, uma agregação (o `MAX` de cada coluna e `COUNT(*)`) sobre o queryset filtrado, que na paginação por número de
+        página tem o mesmo custo do `COUNT(*)` que a própria paginação já executa. Se o cliente já tiver
+        a versão atual (`If-None-Match` / `If-Modified-Since`), a view responde 304 sem executar a
+        consulta da página.
+
+            O ETag também considera a URL da requisição (host e parâmetros), pois cada página e ordenação
+        é uma representação diferente. Fica disponível em `self.etag` para o restante da view.
+        Dados de outros modelos presentes na representação (ex.: o `username` do autor) atualizam o
+        `updated_at` dos registros quando mudam (`api.signals`).
+
+            O `Last-Modified` é a data mais recente entre as colunas de `conditional_fields`.
+    """
+    etag: Optional[str] = None
+
+    # Colunas de data que mudam junto com a representação de um registro.
+    conditional_fields: tuple[str, ...] = ('updated_at',)
+
+    # Em views de detalhe, a ausência do registro é tratada pela própria view (404).
+    conditional_requires_object = False
+
+    def get_conditional_queryset(self) -> QuerySet:
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = getattr(self, 'paginator', None)
+
+        if isinstance(paginator, KeysetPagination):
+            return paginator.prepare_queryset(
+                queryset.values_list('id', *self.conditional_fields), self.request, self
+            )
+
+        return queryset
+
+    def get_conditional_validators(self) -> Optional[tuple[str, Optional[datetime]]]:
+        queryset = self.get_conditional_queryset()
+
+        if queryset.query.is_sliced:
+            return self.build_validators(self.aggregate_rows(list(queryset)))
+
+        return self.build_validators(
+            self.aggregate_queryset(queryset.order_by().aggregate(**self.get_aggregates()))
+        )
+
+    async def aget_conditional_validators(self) -> Optional[tuple[str, Optional[datetime]]]:
+        queryset = self.get_conditional_queryset()
+
+        if queryset.query.is_sliced:
+            return self.build_validators(self.aggregate_rows([row async for row in queryset]))
+
+        return self.build_validators(
+            self.aggregate_queryset(await queryset.order_by().aaggregate(**self.get_aggregates()))
+        )
+
+    def get_aggregates(self) -> dict:
+        return {
+            **{f'last_{field}': Max(field) for field in self.conditional_fields},
+            'count': Count('id'),
+        }
+
+    def aggregate_queryset(self, aggregate: dict) -> dict:
+        versions = tuple(aggregate[f'last_{field}'] for field in self.conditional_fields)
+
+        return {
+            'last_modified': max(filter(None, versions), default=None),
+            'count': aggregate['count'],
+            'versions': versions,
+        }
+
+    @staticmethod
+    def aggregate_rows(rows: list[tuple]) -> dict:
+        """
+            Validadores de uma página: além da data mais recente, as próprias linhas `(id, *conditional_fields)`,
+            para que a remoção ou a entrada de um registro na página também mude o ETag.
+        """
+        return {
+            'last_modified': max(filter(None, (value for _, *values in rows for value in values)), default=None),
+            'count': len(rows),
+            'rows': rows,
+        }
+
+    def build_validators(self, aggregate: dict) -> Optional[tuple[str, Optional[datetime]]]:
+        if self.conditional_requires_object and not aggregate['count']:
+            return None
+
+        last_modified = aggregate['last_modified']
+        request: Request = self.request
+
+        params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+        source = repr((
+            request.get_host(), request.path, params, last_modified, aggregate['count'],
+            aggregate.get('versions'), aggregate.get('rows')
+        ))
+
+        self.etag = '"%s"' % sha1(source.encode('utf-8'), usedforsecurity=False).hexdigest()
+
+        return self.etag, last_modified
+
+    def get_not_modified_response(self, validators: Optional[tuple[str, Optional[datetime]]]):
+        """
+            Retorna a resposta 304 (ou 412) quando as pré-condições da requisição permitirem.
+        """
+        if validators is None:
+            return None
+
+        etag, last_modified = validators
+
+        return get_conditional_response(
+            self.request._request,
+            etag=etag,
+            last_modified=int(last_modified.timestamp()) if last_modified else None
+        )
+
+    @staticmethod
+    def set_validator_headers(response, validators: Optional[tuple[str, Optional[datetime]]]):
+        if validators is None or response.status_code != 200:
+            return
+
+        etag, last_modified = validators
+        response['ETag'] = etag
+
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+
+    def get(self, request, *args, **kwargs) -> Response:
+        validators = self.get_conditional_validators()
+
+        not_modified = self.get_not_modified_response(validators)
+
+        if not_modified is not None:
+            return not_modified
+
+        response = super().get(request, *args, **kwargs)
+        self.set_validator_headers(response, validators)
+
+        return response
@@ -0,0 +1,88 @@
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Optional
+
+from LostMinerCommunity import settings
+
+from cachetools import TTLCache
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class ConfirmationStore(ABC):
+    """
+            Interface dos armazenamentos de códigos de confirmação.
+
+            Cada código aponta para os dados da operação pendente (registro, login ou troca de senha)
+        até ser usado pelo `Authorize` ou expirar após `CONFIRMATION_CODE_TTL_SECONDS`.
+    """
+
+    @abstractmethod
+    def get(self, code: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def set(self, code: str, data: dict):
+        ...
+
+    @abstractmethod
+    def delete(self, code: str):
+        ...
+
+    def __setitem__(self, code: str, data: dict):
+        self.set(code, data)
+
+
+class MemoryConfirmationStore(ConfirmationStore):
+    """
+            Armazena os códigos em um `TTLCache` do próprio processo.
+        Só é adequado quando a API roda com um único worker.
+    """
+
+    def __init__(self, maxsize: int = None, ttl: int = None):
+        self._cache = TTLCache(
+            maxsize=maxsize or settings.CONFIRMATION_CODE_MAXSIZE,
+            ttl=ttl or settings.CONFIRMATION_CODE_TTL_SECONDS
+        )
+        self._lock = Lock()
+
+    def get(self, code: str) -> Optional[dict]:
+        with self._lock:
+            return self._cache.get(code)
+
+    def set(self, code: str, data: dict):
+        with self._lock:
+            self._cache[code] = data
+
+    def delete(self, code: str):
+        with self._lock:
+            self._cache.pop(code, None)
+
+
+class CacheConfirmationStore(ConfirmationStore):
+    """
+            Armazena os códigos em um cache do framework de cache do Django (`CACHES`), compartilhado
+        entre todos os workers que usam o mesmo backend (arquivo, banco ou Redis).
+    """
+
+    key_prefix = 'confirm_code:'
+
+    def __init__(self, alias: str = None, ttl: int = None):
+        self._cache = caches[alias or settings.CONFIRMATION_CODE_CACHE_ALIAS]
+        self._ttl = ttl or settings.CONFIRMATION_CODE_TTL_SECONDS
+
+    def get(self, code: str) -> Optional[dict]:
+        return self._cache.get(self.key_prefix + code)
+
+    def set(self, code: str, data: dict):
+        self._cache.set(self.key_prefix + code, data, timeout=self._ttl)
+
+    def delete(self, code: str):
+        self._cache.delete(self.key_prefix + code)
+
+
+def get_confirmation_store() -> ConfirmationStore:
+    """
+        Instancia o armazenamento configurado em `settings.CONFIRMATION_CODE_STORE`.
+    """
+    return import_string(settings.CONFIRMATION_CODE_STORE)()
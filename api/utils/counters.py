@@ -0,0 +1,129 @@
+import logging
+from collections import Counter, defaultdict
+from threading import Lock, Thread
+
+from LostMinerCommunity import settings
+from api.models import Content
+from api.utils import metrics
+
+from django.db import DatabaseError, connections
+from django.db.models import Case, F, Model, Value, When
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """
+            Acumula incrementos de campos contadores de um modelo na memória do processo e os grava em lote.
+
+            Cada `flush` transforma os incrementos pendentes em um `UPDATE` por lote de `batch_size` linhas
+        (`SET campo = campo + CASE id WHEN ... END`), sem alterar `updated_at`. Como os valores são somados
+        no banco, vários processos podem gravar os seus buffers de forma independente.
+
+            `extra_updates` são valores gravados junto com os incrementos (ex.: marcar a linha para recálculo).
+
+            Se a gravação falhar, os incrementos voltam para o buffer e são tentados no próximo `flush`.
+        Ao atingir `max_pending` linhas pendentes, um `flush` é iniciado em uma thread própria, sem bloquear
+        quem incrementou (que pode ser uma view assíncrona).
+    """
+
+    def __init__(
+        self, model: type[Model], fields: tuple[str, ...], batch_size: int, max_pending: int, extra_updates: dict = None
+    ):
+        self.model = model
+        self.fields = fields
+        self.extra_updates = extra_updates or {}
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+
+        self._pending: defaultdict[int, Counter] = defaultdict(Counter)
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._flushing = False
+
+    def increment(self, field: str, pk: int, amount: int = 1):
+        with self._lock:
+            self._pending[pk][field] += amount
+            full = len(self._pending) >= self.max_pending and not self._flushing
+
+            if full:
+                self._flushing = True
+
+        if full:
+            Thread(target=self._background_flush, name='counters-flush', daemon=True).start()
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._flushing = False
+
+            connections.close_all()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def drain(self) -> dict[int, Counter]:
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(Counter)
+
+        return pending
+
+    def restore(self, pending: dict[int, Counter]):
+        with self._lock:
+            for pk, counts in pending.items():
+                self._pending[pk].update(counts)
+
+    def flush(self) -> int:
+        """
+            Grava os incrementos pendentes.
+
+            Retorna:
+                int: O número de linhas atualizadas.
+        """
+        with self._flush_lock:
+            pending = self.drain()
+            pks = sorted(pending)
+            updated = 0
+
+            for offset in range(0, len(pks), self.batch_size):
+                batch = pks[offset:offset + self.batch_size]
+
+                try:
+                    updated += self.model.objects.filter(pk__in=batch).update(**self.get_updates(batch, pending))
+                except DatabaseError:
+                    self.restore({pk: pending[pk] for pk in pks[offset:]})
+                    logger.exception('Failed to flush %s counters, %s rows kept for retry', self.model.__name__, len(pks) - offset)
+                    break
+
+                for field in self.fields:
+                    metrics.increment(
+                        'counter_increments_flushed_total', sum(pending[pk][field] for pk in batch),
+                        model=self.model._meta.label, field=field
+                    )
+
+            return updated
+
+    def get_updates(self, pks: list[int], pending: dict[int, Counter]) -> dict:
+        updates = dict(self.extra_updates)
+
+        for field in self.fields:
+            whens = [When(pk=pk, then=Value(pending[pk][field])) for pk in pks if pending[pk][field]]
+
+            if whens:
+                updates[field] = F(field) + Case(*whens, default=Value(0))
+
+        return updates
+
+
+content_counters = CounterBuffer(
+    Content,
+    ('views_count', 'downloads_count'),
+    batch_size=settings.COUNTERS_FLUSH_BATCH_SIZE,
+    max_pending=settings.COUNTERS_MAX_PENDING,
+    extra_updates={'trending_dirty': True}
+)
+
+metrics.register_collector(lambda: [('content_counters_pending', 'gauge', {}, content_counters.pending())])
@@ -0,0 +1,122 @@
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, Mapping
+
+from LostMinerCommunity import settings
+from api.models import Comment, Content
+from api.utils.fast_serializers import CommentValuesSerializer, ContentValuesSerializer, get_values_serializer
+from api.utils.filters import ContentFilterBackend
+from api.utils.renderers import FastJSONRenderer
+from api.utils.serializers import CommentSerializer, ContentSerializer
+
+from django.db.models import QuerySet
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+from rest_framework.exceptions import ValidationError
+
+# Parâmetro -> lookup do intervalo de criação (inclusivo).
+CREATED_AT_PARAMS = {
+    'created_after': 'created_at__gte',
+    'created_before': 'created_at__lte',
+}
+
+
+def parse_datetime_param(name: str, value: str) -> datetime:
+    """
+        Converte um parâmetro ISO 8601 (data e hora, ou só a data, valendo a meia-noite) em `datetime`.
+        Sem fuso explícito, usa o fuso atual.
+    """
+    try:
+        parsed = parse_datetime(value)
+
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime(day.year, day.month, day.day) if day else None
+    except ValueError:
+        parsed = None
+
+    if parsed is None:
+        raise ValidationError({name: 'A valid ISO 8601 date or datetime is required.'})
+
+    if settings.USE_TZ and is_naive(parsed):
+        parsed = make_aware(parsed)
+
+    return parsed
+
+
+def get_export_queryset(params: Mapping[str, str]) -> QuerySet[Content]:
+    """
+        Conteúdos exportados, em ordem de ID, com os filtros de `ContentFilterBackend` (categoria, versão,
+        resolução e autor) e o intervalo de criação `created_after` / `created_before`.
+    """
+    queryset = ContentFilterBackend().filter_params(Content.objects.all(), params)
+
+    for param, lookup in CREATED_AT_PARAMS.items():
+        value = params.get(param)
+
+        if value:
+            queryset = queryset.filter(**{lookup: parse_datetime_param(param, value)})
+
+    return ContentSerializer.setup_eager_loading(queryset).order_by('id')
+
+
+def get_comments(content_ids: list[int]) -> dict[int, list[dict]]:
+    """
+        Comentários dos conteúdos `content_ids`, agrupados por conteúdo e em ordem de criação, com uma
+        única consulta (atendida pelo índice `comment_content_created_idx`).
+    """
+    values_serializer = get_values_serializer(CommentValuesSerializer)
+    queryset = CommentSerializer.setup_eager_loading(
+        Comment.objects.filter(content_id__in=content_ids)
+    ).order_by('content_id', 'created_at', 'id')
+
+    comments = defaultdict(list)
+
+    for comment in values_serializer.serialize(values_serializer.values(queryset)):
+        comments[comment['content']].append(comment)
+
+    return comments
+
+
+def export_lines(queryset: QuerySet[Content], comments: bool = False, chunk_size: int = None) -> Iterator[bytes]:
+    """
+            Gera a exportação em NDJSON: uma linha por conteúdo, com a mesma representação de `contents/details`
+        e, com `comments`, a lista dos comentários do conteúdo no campo `comments`.
+
+            As linhas são lidas com `.values().iterator(chunk_size)` (um cursor do lado do servidor no
+        PostgreSQL) e convertidas em lotes de `chunk_size`, com uma consulta de comentários por lote. A memória
+        usada depende apenas do tamanho do lote, e não do tamanho do catálogo. Cada lote é gerado como um único
+        bloco de bytes.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    values_serializer = get_values_serializer(ContentValuesSerializer)
+    render = FastJSONRenderer().render
+    rows = values_serializer.values(queryset).iterator(chunk_size=chunk_size)
+
+    while chunk := list(islice(rows, chunk_size)):
+        contents = values_serializer.serialize(chunk)
+
+        if comments:
+            grouped = get_comments([content['id'] for content in contents])
+
+            for content in contents:
+                content['comments'] = grouped.get(content['id'], [])
+
+        yield b''.join(render(content) + b'\n' for content in contents)
+
+
+def gzip_stream(chunks: Iterable[bytes], level: int = None) -> Iterator[bytes]:
+    """
+        Comprime `chunks` no formato gzip à medida que são gerados. Cada bloco é enviado por completo
+        (`Z_SYNC_FLUSH`), para que o cliente receba os dados sem esperar o fim da exportação.
+    """
+    compressor = zlib.compressobj(
+        settings.EXPORT_GZIP_LEVEL if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+    )
+
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    yield compressor.flush()
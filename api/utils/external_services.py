@@ -1,11 +1,33 @@
-from cloudinary import uploader
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import lru_cache
 
+from LostMinerCommunity import settings
+from api.utils.mail_queue import mail_queue
+from api.utils.metrics import timed_external
+from api.utils.storage import get_image_storage
+
+from django.core.files.uploadedfile import UploadedFile
 from django.core.mail import EmailMessage
-from django.template.loader import render_to_string
+from django.template.loader import get_template
+
+
+@lru_cache(maxsize=None)
+def get_email_template(name: str):
+    """
+        Carrega e compila o template de e-mail uma única vez por processo.
+    """
+    return get_template(name)
 
 
 def send_confirm_code(email: str, username: str, code: str,):
-    html_content = render_to_string('confirm_code.html', {
+    """
+        Envia o código de confirmação para o e-mail do usuário.
+
+        A mensagem é colocada na `mail_queue` e entregue em segundo plano, sem bloquear a requisição;
+        com `MAIL_QUEUE_WORKERS = 0` o envio é feito de forma síncrona.
+    """
+    html_content = get_email_template('confirm_code.html').render({
         'code': code,
         'name': username
     })
@@ -18,10 +40,41 @@ def send_confirm_code(email: str, username: str, code: str,):
     )
 
     email.content_subtype = 'html'
-    email.send()
 
+    if settings.MAIL_QUEUE_WORKERS:
+        mail_queue.enqueue(email)
+    else:
+        with timed_external('smtp'):
+            email.send()
+
+
+# Pool compartilhado por todas as requisições do processo, limitando os uploads simultâneos.
+upload_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_UPLOAD_MAX_WORKERS, thread_name_prefix='image-upload')
+
+
+def upload_image(file: UploadedFile, folder: str) -> str:
+    storage = get_image_storage()
+
+    with timed_external(storage.service_name):
+        return storage.upload(file, folder)
+
+
+def upload_images(files: dict[str, UploadedFile], folder: str) -> dict[str, str]:
+    """
+        Envia várias imagens em paralelo, usando o `upload_executor`.
+
+        Parâmetros:
+            files (dict[str, UploadedFile]): As imagens indexadas pelo nome do campo da requisição.
+            folder (str): A pasta de destino no serviço de armazenamento.
+
+        Retorna:
+            dict[str, str]: As URLs das imagens, indexadas pelo mesmo nome do campo.
+    """
+    # Cada upload roda com uma cópia do contexto da requisição, para que o tempo gasto conte nas suas métricas.
+    futures = {
+        name: upload_executor.submit(copy_context().run, upload_image, file, folder)
+        for name, file in files.items()
+    }
 
-def upload_image(file, folder: str) -> str:
-    upload_result = uploader.upload_image(file, folder=folder + '/')
+    return {name: future.result() for name, future in futures.items()}
 
-    return upload_result.url
@@ -0,0 +1,167 @@
+from functools import lru_cache
+from typing import Callable, Iterable
+
+from api.utils.serializers import ContentSerializer, CommentSerializer
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+from django.utils.timezone import get_current_timezone
+from rest_framework import fields as drf_fields
+from rest_framework.relations import PrimaryKeyRelatedField
+from rest_framework.response import Response
+from rest_framework.serializers import ModelSerializer
+from rest_framework.settings import api_settings
+
+from LostMinerCommunity import settings
+
+
+def format_datetime(value, timezone):
+    """
+        Mesma representação do `DateTimeField` do DRF (ISO 8601 no fuso `timezone`, `Z` para UTC).
+    """
+    if not value:
+        return None
+
+    if timezone is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone)
+
+    value = value.isoformat()
+
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def format_author() -> tuple[tuple[str, ...], Callable]:
+    return ('author_id', 'author__username'), lambda row, timezone: {
+        'user_id': row['author_id'], 'username': row['author__username']
+    }
+
+
+class ValuesSerializer:
+    """
+            Versão somente leitura e rápida de um `ModelSerializer`, para as listagens.
+
+            As linhas vêm de `queryset.values(...)` (sem instanciar modelos) e são convertidas em
+        dicionários simples, com os mesmos campos, na mesma ordem e com a mesma representação do
+        `serializer_class`, de modo que a resposta renderizada é idêntica byte a byte
+        (veja `bench_serializers`).
+
+            Os campos simples são lidos direto da coluna do modelo; os demais (ex.: `SerializerMethodField`)
+        são declarados em `computed_fields` com as colunas de que precisam. As funções que montam os
+        valores recebem a linha e o fuso horário atual, obtido uma única vez por chamada de `serialize`. Campos de tipos não suportados
+        geram `ImproperlyConfigured`, para que uma alteração no serializer não quebre a paridade em silêncio.
+    """
+    serializer_class: type[ModelSerializer]
+
+    # Nome do campo -> (colunas de `.values()`, função que monta o valor a partir da linha e do fuso).
+    computed_fields: dict[str, tuple[tuple[str, ...], Callable]] = {}
+
+    # Campos cuja representação é o próprio valor da coluna.
+    plain_field_types = (
+        drf_fields.IntegerField, drf_fields.FloatField, drf_fields.CharField, drf_fields.ChoiceField,
+        drf_fields.JSONField, PrimaryKeyRelatedField,
+    )
+
+    def __init__(self):
+        model = self.serializer_class.Meta.model
+        columns, builders = [], []
+
+        for name, field in self.serializer_class().fields.items():
+            if name in self.computed_fields:
+                field_columns, builder = self.computed_fields[name]
+                columns.extend(field_columns)
+
+            elif isinstance(field, drf_fields.DateTimeField):
+                column = model._meta.get_field(field.source).attname
+                columns.append(column)
+
+                if getattr(field, 'format', api_settings.DATETIME_FORMAT).lower() == drf_fields.ISO_8601:
+                    builder = lambda row, timezone, column=column: format_datetime(row[column], timezone)
+                else:
+                    builder = lambda row, timezone, column=column, field=field: field.to_representation(row[column])
+
+            elif isinstance(field, self.plain_field_types) and not getattr(field, 'binary', False):
+                column = model._meta.get_field(field.source).attname
+                columns.append(column)
+                builder = lambda row, timezone, column=column: row[column]
+
+            else:
+                raise ImproperlyConfigured(
+                    f'{type(self).__name__}: field {name!r} ({type(field).__name__}) is not supported.'
+                )
+
+            builders.append((name, builder))
+
+        self.columns = tuple(dict.fromkeys(columns))
+        self.builders = tuple(builders)
+
+    def values(self, queryset: QuerySet) -> QuerySet:
+        return queryset.values(*self.columns)
+
+    def serialize(self, rows: Iterable[dict]) -> list[dict]:
+        builders = self.builders
+        timezone = get_current_timezone() if settings.USE_TZ else None
+
+        return [{name: build(row, timezone) for name, build in builders} for row in rows]
+
+
+class ContentValuesSerializer(ValuesSerializer):
+    serializer_class = ContentSerializer
+    computed_fields = {
+        'author': format_author(),
+    }
+
+
+def _answering(row: dict, timezone):
+    if row['answering_id'] is None:
+        return None
+
+    return {
+        'id': row['answering_id'],
+        'author': {
+            'user_id': row['answering__author_id'],
+            'username': row['answering__author__username'],
+        }
+    }
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    serializer_class = CommentSerializer
+    computed_fields = {
+        'author': format_author(),
+        'answering': (('answering_id', 'answering__author_id', 'answering__author__username'), _answering),
+        'content': (('content_id',), lambda row, timezone: row['content_id']),
+    }
+
+
+@lru_cache
+def get_values_serializer(serializer_class: type[ValuesSerializer]) -> ValuesSerializer:
+    """
+        Instância compartilhada de cada `ValuesSerializer`: as colunas e conversões são calculadas uma única vez.
+    """
+    return serializer_class()
+
+
+class ValuesListMixin:
+    """
+            Listagem com o `ValuesSerializer` da view (`values_serializer_class`) no lugar do serializer do DRF.
+        A paginação é feita sobre as linhas de `.values()`, e só a página é convertida.
+    """
+    values_serializer_class: type[ValuesSerializer] = None
+
+    def get_values_serializer(self) -> ValuesSerializer:
+        return get_values_serializer(self.values_serializer_class)
+
+    def get_list_queryset(self) -> QuerySet:
+        return self.get_values_serializer().values(self.filter_queryset(self.get_queryset()))
+
+    def serialize_list(self, rows: Iterable[dict]) -> list[dict]:
+        return self.get_values_serializer().serialize(rows)
+
+    def list(self, request, *args, **kwargs) -> Response:
+        queryset = self.get_list_queryset()
+        page = self.paginate_queryset(queryset)
+
+        if page is not None:
+            return self.get_paginated_response(self.serialize_list(page))
+
+        return Response(self.serialize_list(queryset))
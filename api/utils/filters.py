@@ -0,0 +1,109 @@
+from typing import Mapping
+
+from api.models import Content
+
+from django.db import connection
+from django.db.models import QuerySet
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class ContentFilterBackend(BaseFilterBackend):
+    """
+            Filtros de conteúdos pelos parâmetros da requisição:
+
+        - `category`: categoria exata;
+        - `version`: prefixo da versão (ex.: `1.20` inclui `1.20.4`);
+        - `resolution`, `resolution_min`, `resolution_max`: resolução exata ou intervalo (inclusivo);
+        - `author`: ID do autor.
+
+            As combinações comuns são atendidas pelos índices `content_cat_res_version_idx`
+        e `content_version_pattern_idx` (veja `explain_queries --check`).
+    """
+    integer_params = {
+        'resolution': 'resolution',
+        'resolution_min': 'resolution__gte',
+        'resolution_max': 'resolution__lte',
+        'author': 'author_id',
+    }
+
+    def filter_queryset(self, request, queryset: QuerySet[Content], view) -> QuerySet[Content]:
+        return self.filter_params(queryset, request.query_params)
+
+    def filter_params(self, queryset: QuerySet[Content], params: Mapping[str, str]) -> QuerySet[Content]:
+        filters = {}
+
+        category = params.get('category')
+
+        if category:
+            if category not in dict(Content.category_choices):
+                raise ValidationError({'category': f'"{category}" is not a valid choice.'})
+
+            filters['category'] = category
+
+        for param, lookup in self.integer_params.items():
+            value = params.get(param)
+
+            if not value:
+                continue
+
+            try:
+                number = int(value)
+            except ValueError:
+                raise ValidationError({param: 'A valid integer is required.'})
+
+            # Valores fora do intervalo de um `bigint` não chegam ao banco (`OverflowError` no SQLite).
+            if not -2 ** 63 <= number < 2 ** 63:
+                raise ValidationError({param: 'A valid 64-bit integer is required.'})
+
+            filters[lookup] = number
+
+        version = params.get('version')
+
+        if version:
+            filters.update(self.get_prefix_filters('version', version))
+
+        return queryset.filter(**filters) if filters else queryset
+
+    @staticmethod
+    def get_prefix_filters(field: str, prefix: str) -> dict:
+        """
+            Filtro de prefixo (`LIKE 'prefixo%'`). No PostgreSQL o `LIKE` usa o índice com
+            `varchar_pattern_ops`; no SQLite (onde o `LIKE` não usa índices) é acrescentado o intervalo
+            equivalente `[prefixo, sucessor do prefixo)`, que permite a busca no índice.
+        """
+        filters = {f'{field}__startswith': prefix}
+
+        if connection.vendor == 'sqlite' and ord(prefix[-1]) < 0x10FFFF:
+            filters[f'{field}__gte'] = prefix
+            filters[f'{field}__lt'] = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+        return filters
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': 'category',
+                'required': False,
+                'in': 'query',
+                'description': 'Only contents of this category.',
+                'schema': {'type': 'string', 'enum': list(dict(Content.category_choices))},
+            },
+            {
+                'name': 'version',
+                'required': False,
+                'in': 'query',
+                'description': 'Only contents whose version starts with this value.',
+                'schema': {'type': 'string'},
+            },
+            *(
+                {
+                    'name': param,
+                    'required': False,
+                    'in': 'query',
+                    'description': f'Filter by {lookup.replace("__", " ")}.',
+                    'schema': {'type': 'integer'},
+                }
+                for param, lookup in self.integer_params.items()
+            ),
+        ]
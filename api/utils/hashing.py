@@ -0,0 +1,22 @@
+"""
+    Funções do bcrypt executadas pelo pool de processos de `api.utils.security`.
+
+    Este módulo não importa o Django, para que os processos do pool possam importá-lo
+    sem configurar o projeto.
+"""
+from bcrypt import checkpw, gensalt, hashpw
+
+
+def bcrypt_hash(password: bytes, rounds: int) -> bytes:
+    return hashpw(password, gensalt(rounds))
+
+
+def bcrypt_check(password: bytes, hashed: bytes) -> bool:
+    return checkpw(password, hashed)
+
+
+def bcrypt_rounds(hashed: str) -> int:
+    """
+        Extrai o fator de custo de um hash bcrypt (ex.: `$2b$12$...` -> 12).
+    """
+    return int(hashed.split('$')[2])
@@ -0,0 +1,63 @@
+from typing import Optional
+
+from django.db.models import Model
+
+
+class IdentityMap:
+    """
+            Objetos já carregados durante uma requisição, indexados pelo modelo e pela chave primária.
+
+            Garante que uma mesma linha seja lida uma única vez por requisição: quem a carrega primeiro
+        (a verificação de permissão, por exemplo) a registra aqui, e os passos seguintes reutilizam a instância.
+    """
+
+    def __init__(self):
+        self._objects: dict[tuple[str, object], Model] = {}
+
+    def get(self, model: type[Model], pk) -> Optional[Model]:
+        return self._objects.get((model._meta.label, model._meta.pk.to_python(pk)))
+
+    def add(self, instance: Model) -> Model:
+        self._objects[(instance._meta.label, instance.pk)] = instance
+
+        return instance
+
+
+def get_identity_map(request) -> IdentityMap:
+    """
+        Retorna o `IdentityMap` da requisição, criando-o no primeiro acesso. Aceita tanto a `Request` do DRF
+        quanto o `HttpRequest` do Django, que compartilham o mesmo mapa.
+    """
+    request = getattr(request, '_request', request)
+    identity_map = getattr(request, 'identity_map', None)
+
+    if identity_map is None:
+        identity_map = request.identity_map = IdentityMap()
+
+    return identity_map
+
+
+class IdentityMapMixin:
+    """
+            Faz o `get_object` consultar o `IdentityMap` da requisição antes do banco, registrando nele o objeto
+        carregado. As permissões de objeto são verificadas nos dois casos.
+
+            Só se aplica quando a busca é pela chave primária (`lookup_field` igual a `id` ou `pk`).
+    """
+
+    def get_object(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        model = self.get_queryset().model
+
+        if self.lookup_field not in ('pk', model._meta.pk.name) or lookup_url_kwarg not in self.kwargs:
+            return super().get_object()
+
+        identity_map = get_identity_map(self.request)
+        instance = identity_map.get(model, self.kwargs[lookup_url_kwarg])
+
+        if instance is None:
+            return identity_map.add(super().get_object())
+
+        self.check_object_permissions(self.request, instance)
+
+        return instance
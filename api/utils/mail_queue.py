@@ -0,0 +1,193 @@
+import atexit
+import logging
+import os
+from queue import Queue, Empty
+from threading import Lock, Thread, Timer
+from time import monotonic
+
+from LostMinerCommunity import settings
+from api.utils.metrics import register_collector, timed_external
+
+from django.core.mail import EmailMessage, get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    """
+            Fila de envio de e-mails em segundo plano.
+
+            As views apenas enfileiram a mensagem (`enqueue`) e retornam. Um pool de threads entrega as
+        mensagens reaproveitando a conexão SMTP entre envios: cada worker drena até `batch_size` mensagens
+        por vez na mesma conexão e a fecha após `idle_timeout` segundos sem trabalho. Falhas são
+        reenfileiradas com backoff exponencial até `max_retries` tentativas.
+
+            A fila vive na memória do processo: mensagens pendentes são perdidas se o worker morrer.
+    """
+
+    def __init__(self, workers: int, batch_size: int, max_retries: int, retry_backoff: float, idle_timeout: float):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.idle_timeout = idle_timeout
+
+        self._queue: Queue = Queue()
+        self._threads: list[Thread] = []
+        self._pid = None
+        self._lock = Lock()
+
+        self._counters = {
+            'enqueued': 0,
+            'sent': 0,
+            'retried': 0,
+            'failed': 0,
+            'delivery_seconds_total': 0.0,
+            'delivery_seconds_max': 0.0,
+        }
+
+    def enqueue(self, message: EmailMessage):
+        self._ensure_workers()
+        self._increment('enqueued')
+        self._queue.put((message, monotonic(), 0))
+
+    def stats(self) -> dict:
+        """
+            Retorna os contadores da fila, incluindo a profundidade atual (`depth`).
+        """
+        with self._lock:
+            return {**self._counters, 'depth': self._queue.qsize()}
+
+    def shutdown(self, timeout: float = 10):
+        """
+            Entrega as mensagens pendentes e encerra os workers (chamado no encerramento do processo).
+        """
+        threads = self._threads
+
+        for _ in threads:
+            self._queue.put(None)
+
+        for thread in threads:
+            thread.join(timeout)
+
+    def _increment(self, counter: str, value=1):
+        with self._lock:
+            self._counters[counter] += value
+
+    def _ensure_workers(self):
+        # Após um fork (ex.: workers do gunicorn com --preload) as threads do processo pai não existem.
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._queue = Queue()
+            self._threads = [
+                Thread(target=self._work, name=f'mail-queue-{index}', daemon=True)
+                for index in range(self.workers)
+            ]
+
+            for thread in self._threads:
+                thread.start()
+
+            self._pid = os.getpid()
+
+    def _work(self):
+        connection = None
+
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout)
+            except Empty:
+                if connection is not None:
+                    connection.close()
+                    connection = None
+                continue
+
+            if item is None:
+                break
+
+            batch = [item]
+
+            while len(batch) < self.batch_size:
+                try:
+                    next_item = self._queue.get_nowait()
+                except Empty:
+                    break
+
+                if next_item is None:
+                    # Devolve o sinal de parada para ser tratado após o lote.
+                    self._queue.put(None)
+                    break
+
+                batch.append(next_item)
+
+            for message, enqueued_at, attempts in batch:
+                try:
+                    with timed_external('smtp'):
+                        if connection is None:
+                            connection = get_connection()
+                            connection.open()
+
+                        connection.send_messages([message])
+
+                except Exception as error:
+                    if connection is not None:
+                        connection.close()
+                        connection = None
+
+                    self._retry(message, enqueued_at, attempts, error)
+                    continue
+
+                elapsed = monotonic() - enqueued_at
+                with self._lock:
+                    self._counters['sent'] += 1
+                    self._counters['delivery_seconds_total'] += elapsed
+                    self._counters['delivery_seconds_max'] = max(self._counters['delivery_seconds_max'], elapsed)
+
+        if connection is not None:
+            connection.close()
+
+    def _retry(self, message: EmailMessage, enqueued_at: float, attempts: int, error: Exception):
+        if attempts >= self.max_retries:
+            self._increment('failed')
+            logger.error('Failed to deliver email to %s after %s attempts: %s', message.to, attempts + 1, error)
+            return
+
+        self._increment('retried')
+
+        timer = Timer(
+            self.retry_backoff * 2 ** attempts,
+            self._queue.put,
+            args=((message, enqueued_at, attempts + 1),)
+        )
+        timer.daemon = True
+        timer.start()
+
+
+mail_queue = MailQueue(
+    workers=settings.MAIL_QUEUE_WORKERS,
+    batch_size=settings.MAIL_QUEUE_BATCH_SIZE,
+    max_retries=settings.MAIL_QUEUE_MAX_RETRIES,
+    retry_backoff=settings.MAIL_QUEUE_RETRY_BACKOFF_SECONDS,
+    idle_timeout=settings.MAIL_QUEUE_IDLE_TIMEOUT_SECONDS
+)
+
+atexit.register(mail_queue.shutdown)
+
+
+@register_collector
+def mail_queue_metrics() -> list[tuple[str, str, dict, float]]:
+    stats = mail_queue.stats()
+
+    return [
+        ('mail_queue_depth', 'gauge', {}, stats['depth']),
+        ('mail_queue_delivery_seconds_max', 'gauge', {}, stats['delivery_seconds_max']),
+        ('mail_queue_delivery_seconds_total', 'counter', {}, stats['delivery_seconds_total']),
+        *(
+            (f'mail_queue_{counter}_total', 'counter', {}, stats[counter])
+            for counter in ('enqueued', 'sent', 'retried', 'failed')
+        ),
+    ]
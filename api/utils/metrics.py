@@ -0,0 +1,313 @@
+import json
+import os
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from threading import Lock
+from time import monotonic, perf_counter
+from typing import Callable, Iterable, Optional
+
+_counters: dict[tuple, float] = defaultdict(float)
+_histograms: dict[tuple, tuple[tuple[float, ...], list]] = {}
+_lock = Lock()
+
+# Métricas lidas no momento da coleta (`register_collector`).
+_collectors: list[Callable[[], Iterable[tuple[str, str, dict, float]]]] = []
+
+_last_snapshot = 0.0
+_snapshot_lock = Lock()
+
+# Limites (em segundos) dos histogramas de latência.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def increment(name: str, value: float = 1, **labels):
+    """
+        Incrementa o contador `name` (com os rótulos informados) do processo atual.
+
+        Exemplo:
+            increment('response_cache_requests_total', view='get_content', result='hit')
+    """
+    key = (name, tuple(sorted(labels.items())))
+
+    with _lock:
+        _counters[key] += value
+
+
+def observe(name: str, value: float, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **labels):
+    """
+        Registra `value` no histograma `name` (com os rótulos informados) do processo atual.
+
+        Exemplo:
+            observe('http_request_duration_seconds', 0.012, view='pagination', method='GET')
+    """
+    key = (name, tuple(sorted(labels.items())))
+    index = bisect_left(buckets, value)
+
+    with _lock:
+        if key not in _histograms:
+            # Contagem por faixa (a última é `+Inf`), soma e total.
+            _histograms[key] = (buckets, [[0] * (len(buckets) + 1), 0.0, 0])
+
+        _, state = _histograms[key]
+        state[0][index] += 1
+        state[1] += value
+        state[2] += 1
+
+
+def get_counters() -> dict[tuple, float]:
+    """
+        Retorna uma cópia dos contadores, indexados por `(nome, ((rótulo, valor), ...))`.
+    """
+    with _lock:
+        return dict(_counters)
+
+
+def get_histograms() -> dict[tuple, tuple[tuple[float, ...], list[int], float, int]]:
+    """
+        Retorna uma cópia dos histogramas: `(limites, contagem por faixa, soma, total)` por `(nome, rótulos)`.
+    """
+    with _lock:
+        return {key: (buckets, list(state[0]), state[1], state[2]) for key, (buckets, state) in _histograms.items()}
+
+
+class RequestMetrics:
+    """
+        Medições da requisição em andamento (consultas ao banco, serviços externos, cache de respostas),
+        acessíveis em qualquer ponto do código por `current_request`.
+    """
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.external_seconds: dict[str, float] = defaultdict(float)
+        self.cache: Optional[str] = None
+        self._lock = Lock()
+
+    def add_query(self, seconds: float):
+        with self._lock:
+            self.db_queries += 1
+            self.db_seconds += seconds
+
+    def add_external(self, service: str, seconds: float):
+        # Chamadas externas podem ser feitas em paralelo, em outras threads (ex.: uploads).
+        with self._lock:
+            self.external_seconds[service] += seconds
+
+
+current_request: ContextVar[Optional[RequestMetrics]] = ContextVar('current_request_metrics', default=None)
+
+
+def query_timer(execute, sql, params, many, context):
+    """
+        `execute_wrapper` que soma as consultas e o tempo de banco da requisição em andamento.
+        É instalado em todas as conexões pelo receiver `install_query_timer` (`api.signals`).
+    """
+    request_metrics = current_request.get()
+
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+
+    start = perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.add_query(perf_counter() - start)
+
+
+@contextmanager
+def timed_external(service: str):
+    """
+        Mede uma chamada a um serviço externo (ex.: SMTP, Cloudinary) no histograma
+        `external_call_duration_seconds` e no tempo externo da requisição em andamento.
+    """
+    start = perf_counter()
+
+    try:
+        yield
+    finally:
+        elapsed = perf_counter() - start
+        observe('external_call_duration_seconds', elapsed, service=service)
+
+        request_metrics = current_request.get()
+
+        if request_metrics is not None:
+            request_metrics.add_external(service, elapsed)
+
+
+def _format_labels(labels: Iterable[tuple[str, object]]) -> str:
+    labels = [
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    ]
+
+    return '{' + ','.join(f'{name}="{value}"' for name, value in labels) + '}' if labels else ''
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def register_collector(collector: Callable[[], Iterable[tuple[str, str, dict, float]]]):
+    """
+        Registra uma função que retorna métricas lidas no momento da coleta (`(nome, tipo, rótulos, valor)`),
+        ex.: a profundidade da fila de e-mails.
+    """
+    _collectors.append(collector)
+
+    return collector
+
+
+def local_metrics() -> dict:
+    """
+        Métricas do processo atual: contadores, histogramas e as amostras dos coletores registrados.
+    """
+    return {
+        'counters': get_counters(),
+        'histograms': get_histograms(),
+        'samples': {
+            (name, kind, tuple(sorted(labels.items()))): value
+            for collector in list(_collectors) for name, kind, labels, value in collector()
+        },
+    }
+
+
+def write_snapshot(directory: str, min_interval: float = 0):
+    """
+            Grava as métricas do processo em `<directory>/<pid>.json`, no máximo uma vez a cada `min_interval`
+        segundos. Com vários workers, cada um grava o seu arquivo e a coleta soma todos (`merge_snapshots`).
+
+            O arquivo é substituído de forma atômica. Um worker novo com o PID de um antigo substitui o arquivo
+        dele, o que o Prometheus trata como o reinício dos contadores.
+    """
+    global _last_snapshot
+
+    if not _snapshot_lock.acquire(blocking=False):
+        return
+
+    try:
+        if min_interval and monotonic() - _last_snapshot < min_interval:
+            return
+
+        _last_snapshot = monotonic()
+        data = local_metrics()
+        snapshot = {
+            'pid': os.getpid(),
+            'counters': [[name, labels, value] for (name, labels), value in data['counters'].items()],
+            'histograms': [[name, labels, *state] for (name, labels), state in data['histograms'].items()],
+            'samples': [[name, kind, labels, value] for (name, kind, labels), value in data['samples'].items()],
+        }
+
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+
+        temporary = path / f'{os.getpid()}.json.tmp'
+        temporary.write_text(json.dumps(snapshot))
+        os.replace(temporary, path / f'{os.getpid()}.json')
+    finally:
+        _snapshot_lock.release()
+
+
+def merge_snapshots(directory: str) -> dict:
+    """
+            Soma as métricas gravadas por todos os processos em `directory`, no formato de `local_metrics`.
+
+            Os contadores e histogramas de processos já encerrados continuam somados, para que os totais nunca
+        diminuam. Já os gauges só valem para os processos em execução; são somados, exceto os terminados em
+        `_max`, dos quais vale o maior.
+    """
+    counters: dict[tuple, float] = defaultdict(float)
+    histograms: dict[tuple, tuple] = {}
+    samples: dict[tuple, float] = {}
+
+    for file in Path(directory).glob('*.json'):
+        try:
+            snapshot = json.loads(file.read_text())
+        except (OSError, ValueError):
+            continue
+
+        alive = _is_alive(snapshot['pid'])
+
+        for name, labels, value in snapshot['counters']:
+            counters[(name, _as_labels(labels))] += value
+
+        for name, labels, buckets, counts, total, count in snapshot['histograms']:
+            key = (name, _as_labels(labels))
+            merged = histograms.get(key)
+
+            if merged is None:
+                histograms[key] = (tuple(buckets), counts, total, count)
+            elif merged[0] == tuple(buckets):
+                histograms[key] = (
+                    merged[0], [a + b for a, b in zip(merged[1], counts)], merged[2] + total, merged[3] + count
+                )
+
+        for name, kind, labels, value in snapshot['samples']:
+            if kind == 'gauge' and not alive:
+                continue
+
+            key = (name, kind, _as_labels(labels))
+
+            if key not in samples:
+                samples[key] = value
+            elif kind == 'gauge' and name.endswith('_max'):
+                samples[key] = max(samples[key], value)
+            else:
+                samples[key] += value
+
+    return {'counters': dict(counters), 'histograms': histograms, 'samples': samples}
+
+
+def _as_labels(labels: list) -> tuple:
+    return tuple(tuple(label) for label in labels)
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+
+    return True
+
+
+def render_prometheus(data: dict = None) -> str:
+    """
+        Métricas no formato de texto do Prometheus: as de `data` (no formato de `local_metrics`, ex.: o
+        resultado de `merge_snapshots`) ou, por padrão, as do processo atual.
+    """
+    data = data if data is not None else local_metrics()
+    lines = []
+    types = {}
+
+    samples = defaultdict(list)
+
+    for (name, labels), value in sorted(data['counters'].items()):
+        types[name] = 'counter'
+        samples[name].append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    for (name, labels), (buckets, counts, total, count) in sorted(data['histograms'].items()):
+        types[name] = 'histogram'
+        cumulative = 0
+
+        for limit, bucket_count in zip((*buckets, '+Inf'), counts):
+            cumulative += bucket_count
+            samples[name].append(f'{name}_bucket{_format_labels((*labels, ("le", limit)))} {cumulative}')
+
+        samples[name].append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+        samples[name].append(f'{name}_count{_format_labels(labels)} {count}')
+
+    for (name, kind, labels), value in sorted(data['samples'].items()):
+        types.setdefault(name, kind)
+        samples[name].append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    for name in samples:
+        lines.append(f'# TYPE {name} {types[name]}')
+        lines.extend(samples[name])
+
+    return '\n'.join(lines) + '\n'
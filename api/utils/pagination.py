@@ -1,13 +1,308 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from datetime import date, datetime
+from json import dumps, loads
+from typing import Any, Optional
 
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Field, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-class ContentPagination(PageNumberPagination):
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+        `PageNumberPagination` que também pode ser executada pelas views assíncronas (`apaginate_queryset`).
+    """
+
+    async def apaginate_queryset(self, queryset: QuerySet, request, view=None) -> Optional[list]:
+        page_size = self.get_page_size(request)
+
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        self.page.object_list = [item async for item in self.page.object_list]
+        self.request = request
+
+        return list(self.page)
+
+
+class ContentPagination(AsyncPageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     page_query_param = 'page'
 
 
-class CommentPagination(PageNumberPagination):
+class CommentPagination(AsyncPageNumberPagination):
     page_size = 35
     page_size_query_param = 'page_size'
     page_query_param = 'page'
+
+
+class KeysetPagination(BasePagination):
+    """
+            Paginação por cursor (keyset) sobre a chave composta `(campo de ordenação, id)`.
+
+            Ao contrário da `PageNumberPagination`, não usa `OFFSET` nem executa `COUNT(*)`: cada página é
+        buscada com `WHERE (campo, id) > (valor, id)` a partir do último item da página anterior, usando os
+        índices compostos declarados nos modelos. O cursor é um token opaco (base64) com os valores da chave
+        e a direção da navegação.
+
+            O campo de ordenação é o primeiro termo já aplicado ao queryset (ex.: pelo `OrderingFilter`);
+        o `id` é sempre usado como desempate. O total de itens só é calculado se `count=true` for informado.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        self.count = queryset.count() if self.count_requested(request) else None
+
+        queryset = self.prepare_queryset(queryset, request, view)
+
+        return self.paginate_results(list(queryset))
+
+    async def apaginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        self.count = await queryset.acount() if self.count_requested(request) else None
+
+        queryset = self.prepare_queryset(queryset, request, view)
+
+        return self.paginate_results([item async for item in queryset])
+
+    def prepare_queryset(self, queryset: QuerySet, request, view=None) -> QuerySet:
+        """
+            Aplica ao queryset a ordenação, o filtro do cursor e o limite da página, sem executá-lo.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field, self.descending = self.get_ordering(queryset)
+        self.cursor = self.decode_cursor(request, queryset, self.field)
+
+        # Na navegação para trás a ordem é invertida, e os resultados são desinvertidos em `paginate_results`.
+        reverse = self.cursor is not None and self.cursor['r']
+        descending = self.descending != reverse
+
+        if self.cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(self.field, self.cursor['v'], self.cursor['id'], descending))
+
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(prefix + self.field, prefix + 'id')
+
+        # Um item a mais indica se existe uma próxima página na direção da navegação.
+        return queryset[:self.page_size + 1]
+
+    def paginate_results(self, results: list) -> list:
+        reverse = self.cursor is not None and self.cursor['r']
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+
+        self.page = results
+        self.has_next = has_more if not reverse else True
+        self.has_previous = has_more if reverse else self.cursor is not None
+
+        return results
+
+    def get_paginated_response(self, data) -> Response:
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data) -> OrderedDict:
+        response = OrderedDict()
+
+        if self.count is not None:
+            response['count'] = self.count
+
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+
+        return response
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        if page_size <= 0:
+            return self.page_size
+
+        return min(page_size, self.max_page_size)
+
+    def count_requested(self, request) -> bool:
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true')
+
+    @staticmethod
+    def get_ordering(queryset: QuerySet) -> tuple[str, bool]:
+        ordering = [term for term in queryset.query.order_by if term.lstrip('-') not in ('id', 'pk')]
+
+        if not ordering:
+            return 'id', False
+
+        term = ordering[0]
+
+        return term.lstrip('-'), term.startswith('-')
+
+    @staticmethod
+    def get_keyset_filter(field: str, value: Any, pk: int, descending: bool) -> Q:
+        """
+            Monta o filtro `(field, id) > (value, pk)` (ou `<`, na ordem decrescente).
+            O termo `field >= value` redundante permite ao banco iniciar a busca direto no índice `(field, id)`.
+        """
+        lookup = 'lt' if descending else 'gt'
+
+        if field == 'id':
+            return Q(**{f'id__{lookup}': pk})
+
+        return Q(**{f'{field}__{lookup}e': value}) & (Q(**{f'{field}__{lookup}': value}) | Q(**{f'id__{lookup}': pk}))
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+
+        return self.encode_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or not self.page:
+            return None
+
+        return self.encode_link(self.page[0], reverse=True)
+
+    def encode_link(self, item, reverse: bool) -> str:
+        value = item[self.field] if isinstance(item, dict) else getattr(item, self.field)
+        pk = item['id'] if isinstance(item, dict) else item.id
+
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+
+        token = dumps({'f': self.field, 'v': value, 'id': pk, 'r': reverse}, separators=(',', ':'))
+        token = urlsafe_b64encode(token.encode('utf-8')).decode('ascii').rstrip('=')
+
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, queryset: QuerySet, field: str) -> Optional[dict]:
+        """
+            Lê o cursor da requisição. O valor da chave (`v`) é convertido pelo campo de ordenação
+            (`to_python`); qualquer cursor malformado resulta em `NotFound`.
+        """
+        token = request.query_params.get(self.cursor_query_param)
+
+        if not token:
+            return None
+
+        try:
+            cursor = loads(urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8'))
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(cursor, dict) or not {'f', 'v', 'id', 'r'} <= cursor.keys():
+            raise NotFound(self.invalid_cursor_message)
+
+        # Um cursor só vale para a ordenação em que foi gerado.
+        if cursor['f'] != field or not self.is_valid_integer(cursor['id']) or not isinstance(cursor['r'], bool):
+            raise NotFound(self.invalid_cursor_message)
+
+        if field != 'id':
+            try:
+                cursor['v'] = self.get_ordering_field(queryset, field).to_python(cursor['v'])
+            except (DjangoValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+            if cursor['v'] is None or (isinstance(cursor['v'], int) and not self.is_valid_integer(cursor['v'])):
+                raise NotFound(self.invalid_cursor_message)
+
+        return cursor
+
+    @staticmethod
+    def is_valid_integer(value: Any) -> bool:
+        return isinstance(value, int) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 63
+
+    @staticmethod
+    def get_ordering_field(queryset: QuerySet, field: str) -> Field:
+        annotation = queryset.query.annotations.get(field)
+
+        if annotation is not None:
+            return annotation.output_field
+
+        return queryset.model._meta.get_field(field)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque pagination cursor (empty on the first page).',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include the total number of results.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
+
+
+class ContentKeysetPagination(KeysetPagination):
+    page_size = 10
+
+
+class CommentKeysetPagination(KeysetPagination):
+    page_size = 35
+
+
+class CommentTreePagination(KeysetPagination):
+    """
+        Paginação por cursor dos comentários de primeiro nível de `comments/<content_id>/tree`.
+    """
+    page_size = 10
+
+
+class ContentSearchPagination(KeysetPagination):
+    """
+        Paginação dos resultados da busca, sobre a chave `(rank, id)` em ordem decrescente.
+    """
+    page_size = 10
+
+
+class KeysetPaginationMixin:
+    """
+            Permite que uma view paginada por número de página também seja paginada por cursor.
+
+            A `keyset_pagination_class` é usada quando a requisição informa o parâmetro `cursor`
+        (vazio para a primeira página); caso contrário vale a `pagination_class` da view.
+    """
+    keyset_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            pagination_class = self.pagination_class
+
+            if (self.keyset_pagination_class is not None
+                    and self.keyset_pagination_class.cursor_query_param in self.request.query_params):
+                pagination_class = self.keyset_pagination_class
+
+            self._paginator = pagination_class() if pagination_class is not None else None
+
+        return self._paginator
@@ -1,5 +1,5 @@
-from api.utils.security import get_connection_from_token
-from api.models import User, Content, Comment
+from api.utils.security import get_connection_from_token, aget_connection_from_token, get_stored_connection
+from api.models import Content, Comment
 from api.utils.exceptions import UnauthorizedOperation
 
 from rest_framework import permissions
@@ -13,14 +13,60 @@ class IsAuthenticated(permissions.BasePermission):
     """
 
     def has_permission(self, request: Request, view) -> bool:
+        token = self.get_token(request)
+
+        if not token:
+            return False
+
+        connection = get_connection_from_token(token)
+
+        if not connection:
+            return False
+
+        request.connection = connection
+
+        return True
+
+    async def ahas_permission(self, request, view) -> bool:
+        """
+            Versão assíncrona de `has_permission`, usada pelas views assíncronas.
+        """
+        token = self.get_token(request)
+
+        if not token:
+            return False
+
+        connection = await aget_connection_from_token(token)
+
+        if not connection:
+            return False
+
+        request.connection = connection
+
+        return True
+
+    @staticmethod
+    def get_token(request) -> str | None:
         auth_header = request.headers.get('Authorization')
 
         if not auth_header or not auth_header.startswith('Bearer '):
-            return False
+            return None
 
-        token = auth_header.split(' ', 1)[1]
+        return auth_header.split(' ', 1)[1]
 
-        connection = get_connection_from_token(token)
+
+class IsAuthenticatedStoredConnection(IsAuthenticated):
+    """
+            Como `IsAuthenticated`, mas com a conexão gravada no banco mesmo com `JWT_STATELESS_VERIFICATION`:
+        usada pelas operações sobre a própria conexão (ex.: `RefreshToken`), que não podem aceitar uma conexão
+        já removida.
+    """
+
+    def has_permission(self, request: Request, view) -> bool:
+        if not super().has_permission(request, view):
+            return False
+
+        connection = get_stored_connection(request.connection)
 
         if not connection:
             return False
@@ -36,15 +82,14 @@ class AuthorizeContentOperation(permissions.BasePermission):
 
             Esta permissão garante que o usuário que faz a requisição (identificado por seu ID)
         tenha permissão para realizar a operação no conteúdo. A permissão só será concedida
-        se o ID do usuário for igual ao `id` do conteúdo.
-    """
-
-    def has_permission(self, request: Request, view) -> bool:
-        author_id: User = request.connection.user.id
+        se o ID do usuário for igual ao `author_id` do conteúdo.
 
-        content: Content = Content.objects.get(id=request.parser_context['kwargs'].get('id'))
+            A verificação é feita sobre o objeto carregado pelo `get_object` da view, comparando
+        apenas as chaves, sem carregar o usuário nem buscar o conteúdo novamente.
+    """
 
-        if author_id != content.author.id:
+    def has_object_permission(self, request: Request, view, obj: Content) -> bool:
+        if obj.author_id != request.connection.user_id:
             raise UnauthorizedOperation()
 
         return True
@@ -56,15 +101,13 @@ class AuthorizeCommentOperation(permissions.BasePermission):
 
             Esta permissão garante que o usuário que faz a requisição (identificado por seu ID)
         tenha permissão para realizar a operação em um comentário. A permissão só será concedida
-        se o ID do usuário for igual ao `id` do comentário.
-    """
+        se o ID do usuário for igual ao `author_id` do comentário.
 
-    def has_permission(self, request: Request, view) -> bool:
-        author_id: User = request.connection.user.id
-
-        comment: Comment = Comment.objects.get(id=request.parser_context['kwargs'].get('id'))
+            Assim como em `AuthorizeContentOperation`, a verificação é feita sobre o objeto da view.
+    """
 
-        if author_id != comment.author.id:
+    def has_object_permission(self, request: Request, view, obj: Comment) -> bool:
+        if obj.author_id != request.connection.user_id:
             raise UnauthorizedOperation()
 
         return True
@@ -0,0 +1,49 @@
+import re
+
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Números que o orjson escreve de forma diferente do `json` (`1e-6` / `1e-06`, `0.000025` / `2.5e-05`,
+# `1e16` / `1e+16`): os com expoente e os menores que 1e-4 sem expoente. Um texto parecido dentro de uma
+# string também corresponde, o que só faz a resposta usar o renderer do DRF.
+DIVERGENT_FLOAT = re.compile(rb'[:,\[]-?\d+(?:\.\d+)?e|[:,\[]-?0\.0000')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+            `JSONRenderer` que usa o orjson, quando instalado, para o formato compacto padrão, com saída
+        idêntica à do renderer do DRF: mesmos separadores, UTF-8 sem escapes e `\\u2028` / `\\u2029` escapados.
+        Datas e demais tipos que o orjson trataria de outra forma passam pelo encoder do DRF, e uma saída com
+        números que o orjson formata de outro modo (`DIVERGENT_FLOAT`) é gerada de novo pelo renderer do DRF.
+
+            Sem o orjson, ou com indentação (`Accept: application/json; indent=4`), usa o renderer do DRF.
+
+            Diferença conhecida: `NaN` e `Infinity` são escritos como `null`, enquanto o renderer do DRF
+        (`STRICT_JSON`) gera um erro. Por isso o renderer só é usado nas views do caminho rápido
+        (`FAST_RENDERER_CLASSES`), cujos dados vêm direto das colunas do banco, e não é o padrão global.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data, default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+
+        if DIVERGENT_FLOAT.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+# Renderers das views do caminho rápido (listagens e detalhes lidos com `.values()`).
+FAST_RENDERER_CLASSES = (FastJSONRenderer, BrowsableAPIRenderer)
@@ -0,0 +1,129 @@
+from functools import partial
+from hashlib import md5
+from time import time_ns
+
+from LostMinerCommunity import settings
+from api.utils import metrics
+
+from django.core.cache import caches, BaseCache
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+CONTENT_LIST_GENERATION_KEY = 'contents:generation'
+
+
+def get_response_cache() -> BaseCache:
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def get_generation(cache: BaseCache, key: str) -> int:
+    """
+        Geração atual guardada em `key`, criada na primeira leitura. Trocar a geração invalida, de uma vez,
+        todas as entradas cujas chaves a incluem.
+    """
+    generation = cache.get(key)
+
+    if generation is None:
+        cache.add(key, time_ns(), timeout=None)
+        generation = cache.get(key)
+
+    return generation
+
+
+def content_generation_key(content_id: int) -> str:
+    return f'content:{content_id}:generation'
+
+
+def content_cache_key(content_id: int) -> str:
+    """
+        Chave do detalhe de um conteúdo, com a geração do conteúdo (trocada por `invalidate_content`).
+    """
+    cache = get_response_cache()
+
+    return f'content:{content_id}:{get_generation(cache, content_generation_key(content_id))}'
+
+
+def content_list_cache_key(request: Request) -> str:
+    """
+        Monta a chave de uma página de `contents/list/` a partir do host e dos parâmetros da requisição
+        (os links `next`/`previous` da resposta são absolutos).
+
+        A chave inclui a geração atual da listagem, que muda a cada alteração de um conteúdo:
+        as páginas antigas deixam de ser encontradas e são descartadas pelo LRU do cache.
+    """
+    generation = get_generation(get_response_cache(), CONTENT_LIST_GENERATION_KEY)
+
+    params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+    source = repr((request.scheme, request.get_host(), params))
+    digest = md5(source.encode('utf-8'), usedforsecurity=False).hexdigest()
+
+    return f'contents:{generation}:{digest}'
+
+
+def invalidate_content(content_id: int):
+    """
+            Descarta as respostas em cache afetadas pela alteração de um conteúdo: o detalhe do próprio
+        conteúdo e todas as páginas da listagem.
+
+            Dentro de uma transação, o descarte só é feito após o commit (e não é feito se ela for desfeita):
+        antes disso, uma leitura concorrente ainda vê a linha anterior e voltaria a guardá-la no cache.
+    """
+    transaction.on_commit(partial(discard_content_responses, content_id))
+
+
+def discard_content_responses(content_id: int):
+    cache = get_response_cache()
+
+    # As entradas antigas (uma por ETag) deixam de ser encontradas e são descartadas pelo LRU do cache.
+    cache.set_many({content_generation_key(content_id): time_ns(), CONTENT_LIST_GENERATION_KEY: time_ns()}, timeout=None)
+
+
+class CachedResponseMixin:
+    """
+            Guarda em cache os dados serializados das respostas `GET` bem-sucedidas da view.
+
+            A view define a chave em `get_response_cache_key`. As respostas levam o cabeçalho `X-Cache`
+        (`HIT` ou `MISS`) e os acertos e falhas são contados em `response_cache_requests_total`.
+    """
+    response_cache_name: str
+
+    def get_response_cache_key(self) -> str:
+        raise NotImplementedError
+
+    def get_full_response_cache_key(self) -> str:
+        key = self.get_response_cache_key()
+
+        # Com o `ConditionalGetMixin`, a chave inclui o ETag dos dados atuais: uma entrada nunca é
+        # servida depois que os dados mudam, mesmo que a alteração tenha ocorrido em outro worker.
+        etag = getattr(self, 'etag', None)
+
+        return f'{key}:{etag}' if etag else key
+
+    def get(self, request, *args, **kwargs) -> Response:
+        key = self.get_full_response_cache_key()
+        cache = get_response_cache()
+
+        data = cache.get(key)
+
+        if data is not None:
+            self.record_cache_result('hit')
+            return Response(data, headers={'X-Cache': 'HIT'})
+
+        response = super().get(request, *args, **kwargs)
+
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=settings.RESPONSE_CACHE_TIMEOUT_SECONDS)
+
+        self.record_cache_result('miss')
+        response['X-Cache'] = 'MISS'
+
+        return response
+
+    def record_cache_result(self, result: str):
+        metrics.increment('response_cache_requests_total', view=self.response_cache_name, result=result)
+
+        request_metrics = metrics.current_request.get()
+
+        if request_metrics is not None:
+            request_metrics.cache = result
@@ -0,0 +1,67 @@
+import atexit
+import logging
+from threading import Event, Thread
+from typing import Callable
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask(Thread):
+    """
+            Executa `function` a cada `interval` segundos em uma thread daemon do próprio processo.
+
+            Cada execução usa (e depois descarta) uma conexão própria com o banco. Exceções são registradas
+        e não interrompem as execuções seguintes.
+    """
+
+    def __init__(self, name: str, interval: float, function: Callable[[], object]):
+        super().__init__(name=name, daemon=True)
+        self.interval = interval
+        self.function = function
+        self._stopped = Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.function()
+            except Exception:
+                logger.exception('Periodic task %s failed', self.name)
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self._stopped.set()
+
+
+def start_periodic_task(name: str, interval: float, function: Callable[[], object]) -> PeriodicTask:
+    task = PeriodicTask(name, interval, function)
+    task.start()
+
+    return task
+
+
+def start_background_tasks() -> list[PeriodicTask]:
+    """
+            Inicia as tarefas periódicas habilitadas (intervalo maior que 0) e registra a gravação das contagens
+        pendentes no encerramento do processo.
+
+            Chamada apenas pelos processos do servidor (`LostMinerCommunity.wsgi` / `LostMinerCommunity.asgi`),
+        e não no carregamento do Django: `migrate`, `shell`, os testes e os demais comandos não iniciam threads.
+    """
+    from LostMinerCommunity import settings
+    from api.utils.counters import content_counters
+    from api.utils.security import reap_expired_connections
+    from api.utils.trending import update_trending_scores
+
+    # As contagens ainda pendentes são gravadas quando o processo termina normalmente.
+    atexit.register(content_counters.flush)
+
+    tasks = [
+        ('connection-reaper', settings.CONNECTION_REAPER_INTERVAL_SECONDS, reap_expired_connections),
+        ('content-counters', settings.COUNTERS_FLUSH_INTERVAL_SECONDS, content_counters.flush),
+        ('trending-scores', settings.TRENDING_UPDATE_INTERVAL_SECONDS, update_trending_scores),
+    ]
+
+    return [start_periodic_task(name, interval, function) for name, interval, function in tasks if interval]
@@ -0,0 +1,50 @@
+from re import compile as re_compile
+
+from api.models import Content
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, QuerySet, Value
+from django.db.models.expressions import RawSQL
+
+TOKEN_PATTERN = re_compile(r'\w+')
+
+TABLE = Content._meta.db_table
+FTS_TABLE = f'{TABLE}_fts'
+
+# Mesma expressão do índice GIN criado em `0005_content_search`, para que o PostgreSQL o utilize.
+POSTGRESQL_VECTOR = f"to_tsvector('simple', coalesce({TABLE}.name, '') || ' ' || coalesce({TABLE}.description, ''))"
+
+
+def search_contents(queryset: QuerySet[Content], query: str) -> QuerySet[Content]:
+    """
+        Filtra os conteúdos cujo nome ou descrição contenham todos os termos de `query` (por prefixo)
+        e anota a relevância de cada um em `rank` (maior é melhor).
+
+        Usa o índice GIN de `to_tsvector` no PostgreSQL e a tabela FTS5 `api_content_fts` no SQLite.
+        Os termos são extraídos de `query` e reescritos, então a sintaxe de busca do banco nunca é
+        exposta ao usuário.
+    """
+    tokens = TOKEN_PATTERN.findall(query.lower())
+
+    if not tokens:
+        return queryset.annotate(rank=Value(0.0, output_field=FloatField())).none()
+
+    if connection.vendor == 'postgresql':
+        ts_query = ' & '.join(f'{token}:*' for token in tokens)
+
+        match = RawSQL(f"{POSTGRESQL_VECTOR} @@ to_tsquery('simple', %s)", [ts_query], output_field=BooleanField())
+        rank = RawSQL(f"ts_rank({POSTGRESQL_VECTOR}, to_tsquery('simple', %s))", [ts_query], output_field=FloatField())
+
+        return queryset.filter(match).annotate(rank=rank)
+
+    fts_query = ' '.join(f'"{token}"*' for token in tokens)
+
+    # O filtro avalia o MATCH uma única vez, no índice FTS5; o bm25 (negativo e menor para os melhores
+    # resultados) é lido por uma subconsulta correlacionada, executada apenas para os conteúdos encontrados.
+    match = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [fts_query])
+    rank = RawSQL(
+        f'SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {TABLE}.id',
+        [fts_query], output_field=FloatField()
+    )
+
+    return queryset.filter(Q(id__in=match)).annotate(rank=rank)
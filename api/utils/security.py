@@ -1,18 +1,205 @@
-from datetime import timedelta
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from multiprocessing import get_context
+from threading import Lock
+from time import time
 from typing import Optional
 
 from LostMinerCommunity import settings
 from api.models import Connection
+from api.utils.hashing import bcrypt_check, bcrypt_hash, bcrypt_rounds
 
+from cachetools import TTLCache
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
 from django.utils.timezone import now
 from jose import jwt, JWTError
-from bcrypt import checkpw, hashpw, gensalt
 
+# Conexões válidas (com o usuário já carregado) e o momento em que foram guardadas, indexadas pelo ID da conexão.
+connection_cache = TTLCache(maxsize=settings.CONNECTION_CACHE_MAXSIZE, ttl=settings.CONNECTION_CACHE_TTL_SECONDS)
+connection_cache_lock = Lock()
 
-def create_token(connection: int) -> str:
-    payload = {'con': connection}
+logger = logging.getLogger(__name__)
 
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm='HS256')
+CONNECTION_LIFETIME = timedelta(minutes=settings.CONNECTION_EXPIRATION_TIME_MINUTES)
+
+
+def create_token(connection: Connection) -> str:
+    """
+        Gera o token JWT de uma conexão.
+
+        Além do ID da conexão (`con`), o token carrega o ID do usuário (`usr`) e a expiração (`exp`),
+        o que permite validá-lo sem consultar o banco quando `JWT_STATELESS_VERIFICATION` está ativo.
+    """
+    payload = {
+        'con': connection.id,
+        'usr': connection.user_id,
+        'exp': int((connection.created_at + CONNECTION_LIFETIME).timestamp()),
+    }
+
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def is_connection_alive(connection: Connection) -> bool:
+    return connection.created_at + CONNECTION_LIFETIME >= now()
+
+
+def _revocation_keys(connection: Connection) -> tuple[str, str]:
+    return f'connection:{connection.id}', f'user:{connection.user_id}'
+
+
+def _revoke(key: str):
+    # A marca precisa durar enquanto uma entrada anterior a ela puder estar no `connection_cache` de algum worker
+    # e, na verificação stateless, enquanto um token emitido antes dela ainda não tiver expirado.
+    timeout = settings.CONNECTION_CACHE_TTL_SECONDS
+
+    if settings.JWT_STATELESS_VERIFICATION:
+        timeout = max(timeout, int(CONNECTION_LIFETIME.total_seconds()))
+
+    caches[settings.CONNECTION_REVOCATION_CACHE_ALIAS].set(key, time(), timeout=timeout)
+
+
+def _is_revoked(connection: Connection, since: float) -> bool:
+    """
+        Indica se a conexão ou o seu usuário foram invalidados, em qualquer worker, a partir de `since`
+        (uma única leitura do cache compartilhado).
+    """
+    revocations = caches[settings.CONNECTION_REVOCATION_CACHE_ALIAS].get_many(_revocation_keys(connection))
+
+    return any(revoked_at >= since for revoked_at in revocations.values())
+
+
+def cache_connection(connection: Connection):
+    with connection_cache_lock:
+        connection_cache[connection.id] = (connection, time())
+
+
+def get_cached_connection(connection_id: int) -> Optional[Connection]:
+    """
+            Retorna a conexão do `connection_cache`, a menos que ela ou o seu usuário tenham sido invalidados,
+        em qualquer worker, depois de ela ser guardada.
+
+            As invalidações são marcadas no cache compartilhado `CONNECTION_REVOCATION_CACHE_ALIAS`, consultado
+        a cada acerto do cache local com uma única leitura (`get_many`).
+    """
+    with connection_cache_lock:
+        entry = connection_cache.get(connection_id)
+
+    if entry is None:
+        return None
+
+    connection, cached_at = entry
+
+    if _is_revoked(connection, cached_at):
+        with connection_cache_lock:
+            connection_cache.pop(connection_id, None)
+
+        return None
+
+    return connection
+
+
+def invalidate_connection(connection_id: int):
+    _revoke(f'connection:{connection_id}')
+
+    with connection_cache_lock:
+        connection_cache.pop(connection_id, None)
+
+
+def invalidate_user_connections(user_id: int):
+    """
+        Remove do cache todas as conexões de um usuário (ex.: após alterar os dados do usuário), em todos os workers.
+    """
+    _revoke(f'user:{user_id}')
+
+    with connection_cache_lock:
+        for connection_id, (connection, _) in list(connection_cache.items()):
+            if connection.user_id == user_id:
+                connection_cache.pop(connection_id, None)
+
+
+def create_connection(user_id: int) -> Connection:
+    """
+        Cria uma nova conexão para o usuário, removendo as mais antigas além de `CONNECTIONS_PER_USER_LIMIT`.
+    """
+    connection = Connection.objects.create(user_id=user_id)
+
+    stale_ids = list(
+        Connection.objects
+        .filter(user_id=user_id)
+        .order_by('-created_at', '-id')
+        .values_list('id', flat=True)[settings.CONNECTIONS_PER_USER_LIMIT:]
+    )
+
+    if stale_ids:
+        Connection.objects.filter(id__in=stale_ids).delete()
+
+    return connection
+
+
+def reap_expired_connections(batch_size: int = None) -> int:
+    """
+        Remove as conexões expiradas em lotes de até `batch_size` linhas, percorrendo o índice de `created_at`.
+
+        Retorna:
+            int: O número de conexões removidas.
+    """
+    batch_size = batch_size or settings.CONNECTION_REAPER_BATCH_SIZE
+    total = 0
+
+    while True:
+        expired_ids = list(
+            Connection.objects
+            .filter(created_at__lt=now() - CONNECTION_LIFETIME)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+
+        if not expired_ids:
+            return total
+
+        deleted, _ = Connection.objects.filter(id__in=expired_ids).delete()
+        total += deleted
+
+
+def _stateless_connection(data: dict) -> Optional[Connection]:
+    """
+            Monta uma instância de `Connection` apenas com os dados do token, sem consultar o banco.
+        O usuário (`connection.user`) só é carregado se alguma view o acessar.
+
+            Retorna `None` se a conexão ou o usuário tiverem sido invalidados depois da emissão do token
+        (ex.: um token já trocado pelo `RefreshToken`); nesse caso a conexão é procurada no banco.
+    """
+    expires_at = datetime.fromtimestamp(data['exp'], tz=timezone.utc)
+
+    connection = Connection.from_db(
+        DEFAULT_DB_ALIAS,
+        ['id', 'created_at', 'user_id'],
+        [data['con'], expires_at - CONNECTION_LIFETIME, data['usr']]
+    )
+    connection.is_stateless = True
+
+    # O `exp` do token é truncado em segundos; uma invalidação no mesmo segundo da emissão também é consultada.
+    if _is_revoked(connection, connection.created_at.timestamp() - 1):
+        return None
+
+    return connection
+
+
+def get_stored_connection(connection: Connection) -> Optional[Connection]:
+    """
+        Retorna a conexão gravada no banco equivalente a `connection`, que pode ter sido montada apenas com os
+        dados do token (`JWT_STATELESS_VERIFICATION`), ou `None` se ela não existir mais ou tiver expirado.
+    """
+    if not getattr(connection, 'is_stateless', False):
+        return connection
+
+    stored = Connection.objects.select_related('user').filter(id=connection.id).first()
+
+    return _validate_connection(stored, connection.id)
 
 
 def get_connection_from_token(token: str) -> Optional[Connection]:
@@ -22,7 +209,11 @@ def get_connection_from_token(token: str) -> Optional[Connection]:
         Esta função decodifica o token JWT usando a chave secreta configurada em `settings.SECRET_KEY` e verifica
         se o token contém um ID de conexão válido. Se a conexão associada ao ID não existir ou se a data de criação
         da conexão for maior que 1 dia atrás, a função retornará `None`. Caso contrário, retornará a instância de
-        `Connection`.
+        `Connection`. A função nunca escreve no banco.
+
+        A conexão é procurada primeiro no `connection_cache`. Se `JWT_STATELESS_VERIFICATION` estiver ativo e o
+        token carregar `usr` e `exp`, a validade é decidida pelo token e pelas invalidações do cache compartilhado,
+        sem consultar o banco; só um token com alguma invalidação posterior à sua emissão é procurado no banco.
 
         Parâmetros:
             token (str): O token JWT que contém o ID da conexão no seu payload.
@@ -42,39 +233,143 @@ def get_connection_from_token(token: str) -> Optional[Connection]:
                 # Token inválido ou conexão expirada
         """
     try:
-        data = jwt.decode(token, settings.SECRET_KEY, algorithms=['HS256'])
+        # O claim `exp`, quando presente, já é validado aqui.
+        data = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
 
         # Obtém o ID da conexão do payload
         connection_id = data.get('con')
 
         if not connection_id:
-            print('not id')
+            logger.info('Rejected token: missing connection id')
             return None
 
-        connection = Connection.objects.filter(id=connection_id).first()
+        connection = get_cached_connection(connection_id)
+
+        if connection is None:
+            if settings.JWT_STATELESS_VERIFICATION and 'usr' in data and 'exp' in data:
+                connection = _stateless_connection(data)
+
+                if connection is not None:
+                    return connection
+
+            connection = Connection.objects.select_related('user').filter(id=connection_id).first()
 
-        # Verifica se a conexão existe e se não expirou
-        if connection:
-            if connection.created_at + timedelta(days=1) >= now():
-                return connection
+        return _validate_connection(connection, connection_id)
 
-            connection.delete()
+    except JWTError as error:
+        logger.info('Rejected token: %s', error)
+
+    return None
+
+
+async def aget_connection_from_token(token: str) -> Optional[Connection]:
+    """
+        Versão assíncrona de `get_connection_from_token`, usada pelas views assíncronas.
+    """
+    try:
+        data = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+        connection_id = data.get('con')
+
+        if not connection_id:
+            logger.info('Rejected token: missing connection id')
             return None
 
-        print('expires')
+        connection = get_cached_connection(connection_id)
+
+        if connection is None:
+            if settings.JWT_STATELESS_VERIFICATION and 'usr' in data and 'exp' in data:
+                connection = _stateless_connection(data)
+
+                if connection is not None:
+                    return connection
+
+            connection = await Connection.objects.select_related('user').filter(id=connection_id).afirst()
 
-    except JWTError:
-        print('jwt error')
+        return _validate_connection(connection, connection_id)
+
+    except JWTError as error:
+        logger.info('Rejected token: %s', error)
+
+    return None
+
+
+def _validate_connection(connection: Optional[Connection], connection_id: int) -> Optional[Connection]:
+    # Verifica se a conexão existe e se não expirou.
+    # Conexões expiradas não são removidas aqui, e sim pelo `reap_expired_connections`.
+    if connection:
+        if is_connection_alive(connection):
+            cache_connection(connection)
+            return connection
+
+        invalidate_connection(connection_id)
+        return None
+
+    logger.info('Rejected token: connection %s expired or not found', connection_id)
 
     return None
 
 
+_password_executor: Optional[ProcessPoolExecutor] = None
+_password_executor_pid: Optional[int] = None
+_password_executor_lock = Lock()
+
+
+def get_password_executor(broken: ProcessPoolExecutor = None) -> Optional[ProcessPoolExecutor]:
+    """
+            Retorna o pool de processos do bcrypt, criado na primeira chamada de cada processo.
+        Com `PASSWORD_HASHER_WORKERS = 0` não há pool e o bcrypt roda na própria thread da requisição.
+
+            `broken` é um pool que deixou de funcionar (um processo filho morreu): se ainda for o pool atual,
+        ele é descartado e um novo é criado.
+    """
+    global _password_executor, _password_executor_pid
+
+    if not settings.PASSWORD_HASHER_WORKERS:
+        return None
+
+    with _password_executor_lock:
+        if broken is not None and broken is _password_executor:
+            broken.shutdown(wait=False, cancel_futures=True)
+            _password_executor_pid = None
+
+        if _password_executor_pid != os.getpid():
+            # `spawn` evita herdar o estado (threads, conexões) do worker da API.
+            _password_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASHER_WORKERS,
+                mp_context=get_context('spawn')
+            )
+            _password_executor_pid = os.getpid()
+
+        return _password_executor
+
+
+def _run_bcrypt(function, *args):
+    executor = get_password_executor()
+
+    if executor is None:
+        return function(*args)
+
+    try:
+        return executor.submit(function, *args).result()
+    except BrokenProcessPool:
+        logger.warning('Password hasher pool is broken, recreating it')
+
+    return get_password_executor(broken=executor).submit(function, *args).result()
+
+
 def hash_password(password: str) -> str:
-    salt = gensalt()
-    hashed = hashpw(password.encode('utf-8'), salt)
+    hashed = _run_bcrypt(bcrypt_hash, password.encode('utf-8'), settings.BCRYPT_ROUNDS)
 
     return hashed.decode('utf-8')
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    return checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
\ No newline at end of file
+    return _run_bcrypt(bcrypt_check, password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    """
+        Indica se o hash foi gerado com um fator de custo diferente de `settings.BCRYPT_ROUNDS`.
+    """
+    return bcrypt_rounds(hashed) != settings.BCRYPT_ROUNDS
\ No newline at end of file
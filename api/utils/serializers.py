@@ -1,5 +1,6 @@
 from api.models import Content, Comment
 
+from django.db.models import QuerySet
 from rest_framework import serializers
 
 
@@ -18,14 +19,28 @@ class ContentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Content
-        fields = '__all__'
-        read_only_fields = ('created_at', 'id')
+        exclude = ('trending_dirty', 'scored_at')
+        read_only_fields = (
+            'created_at', 'id', 'comment_count', 'last_comment_at', 'views_count', 'downloads_count',
+            'trending_score'
+        )
 
         extra_kwargs = {
             'images_urls': {'required': False},
             'description': {'required': False}
         }
 
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet[Content]) -> QuerySet[Content]:
+        """
+            Aplica ao queryset a junção e a projeção usadas pelo serializer (autor com id e username),
+            evitando uma consulta extra por conteúdo.
+        """
+        return queryset.select_related('author').only(
+            *(field.name for field in Content._meta.concrete_fields),
+            'author__username'
+        )
+
     @staticmethod
     @format_author
     def get_author(obj: Content): ...
@@ -41,6 +56,21 @@ class ContentSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class ContentBulkSerializer(ContentSerializer):
+    """
+        Serializer de cada item de `contents/bulk`. As restrições de unicidade (`unique_name_version` e
+        `download_url`) não são verificadas item a item, e sim para o lote inteiro pela view, com uma consulta.
+    """
+
+    class Meta(ContentSerializer.Meta):
+        validators = []
+
+        extra_kwargs = {
+            **ContentSerializer.Meta.extra_kwargs,
+            'download_url': {'validators': []},
+        }
+
+
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.SerializerMethodField()
     answering = serializers.SerializerMethodField()
@@ -53,7 +83,20 @@ class CommentSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'answering': {'required': False}
         }
-        read_only_fields = ('created_at', 'id')
+        read_only_fields = ('created_at', 'id', 'root', 'depth')
+
+    @staticmethod
+    def setup_eager_loading(queryset: QuerySet[Comment]) -> QuerySet[Comment]:
+        """
+            Aplica ao queryset as junções e a projeção usadas pelo serializer (autor, comentário respondido
+            e o autor dele), evitando consultas extras por comentário.
+        """
+        return queryset.select_related('author', 'answering__author').only(
+            *(field.name for field in Comment._meta.concrete_fields),
+            'author__username',
+            'answering__author',
+            'answering__author__username'
+        )
 
     @staticmethod
     @format_author
@@ -64,7 +107,7 @@ class CommentSerializer(serializers.ModelSerializer):
         """
             Retorna o ID do conteúdo associado ao comentário.
         """
-        return obj.content.id
+        return obj.content_id
 
     @staticmethod
     def get_answering(obj: Comment):
@@ -81,6 +124,7 @@ class CommentSerializer(serializers.ModelSerializer):
             }
         return None
 
+
 class CommentEditSerializer(serializers.ModelSerializer):
     class Meta:
         model = Comment
@@ -0,0 +1,68 @@
+from functools import lru_cache
+from pathlib import Path
+from uuid import uuid4
+
+from LostMinerCommunity import settings
+
+from cloudinary import uploader
+from django.core.files.uploadedfile import UploadedFile
+from django.utils.module_loading import import_string
+
+
+class ImageStorage:
+    """
+        Interface dos serviços de armazenamento das imagens dos conteúdos.
+    """
+    # Nome do serviço nas métricas (`external_call_duration_seconds`).
+    service_name = 'image_storage'
+
+    def upload(self, file: UploadedFile, folder: str) -> str:
+        """
+            Armazena o arquivo na pasta informada e retorna a URL pública da imagem.
+        """
+        raise NotImplementedError
+
+
+class CloudinaryImageStorage(ImageStorage):
+    service_name = 'cloudinary'
+
+    def upload(self, file: UploadedFile, folder: str) -> str:
+        # Arquivos grandes já estão em disco (`TemporaryUploadedFile`): o Cloudinary os lê pelo caminho,
+        # sem que o conteúdo precise ser carregado na memória do worker.
+        source = file.temporary_file_path() if hasattr(file, 'temporary_file_path') else file
+
+        upload_result = uploader.upload_image(source, folder=folder + '/')
+
+        return upload_result.url
+
+
+class LocalImageStorage(ImageStorage):
+    """
+            Grava as imagens no sistema de arquivos local, em `IMAGE_STORAGE_LOCAL_ROOT`.
+        Substitui o Cloudinary em testes e benchmarks.
+    """
+    service_name = 'local_storage'
+
+    def __init__(self, root: Path = None, base_url: str = None):
+        self.root = Path(root or settings.IMAGE_STORAGE_LOCAL_ROOT)
+        self.base_url = base_url or settings.IMAGE_STORAGE_LOCAL_URL
+
+    def upload(self, file: UploadedFile, folder: str) -> str:
+        directory = self.root / folder
+        directory.mkdir(parents=True, exist_ok=True)
+
+        name = uuid4().hex + Path(file.name or '').suffix
+
+        with open(directory / name, 'wb') as destination:
+            for chunk in file.chunks():
+                destination.write(chunk)
+
+        return f'{self.base_url}{folder}/{name}'
+
+
+@lru_cache(maxsize=None)
+def get_image_storage() -> ImageStorage:
+    """
+        Instancia (uma única vez) o armazenamento configurado em `settings.IMAGE_STORAGE_BACKEND`.
+    """
+    return import_string(settings.IMAGE_STORAGE_BACKEND)()
@@ -0,0 +1,25 @@
+from contextlib import contextmanager
+
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def assert_num_queries(expected: int, using: str = DEFAULT_DB_ALIAS):
+    """
+        Garante que o bloco execute exatamente `expected` consultas no banco.
+
+        Usado para fixar o número de consultas por página das listagens, que não deve crescer
+        com o tamanho da página.
+
+        Exemplo:
+            with assert_num_queries(2):
+                client.get('/api/comments/1/list')
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+
+    if len(context) != expected:
+        queries = '\n'.join(query['sql'] for query in context.captured_queries)
+
+        raise AssertionError(f'{len(context)} queries executed, {expected} expected:\n{queries}')
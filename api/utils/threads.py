@@ -0,0 +1,22 @@
+def build_comment_tree(comments: list[dict], replies: list[dict]) -> list[dict]:
+    """
+            Monta as discussões a partir dos comentários de primeiro nível e de todas as suas respostas
+        (já serializados), em tempo linear: cada resposta é incluída em `replies` do comentário que ela
+        responde. As respostas mantêm a ordem em que foram recebidas.
+
+            Respostas cujo comentário respondido não está entre os recebidos (ex.: além do nível máximo)
+        são descartadas.
+    """
+    nodes = {}
+
+    for node in (*comments, *replies):
+        node['replies'] = []
+        nodes[node['id']] = node
+
+    for reply in replies:
+        parent = nodes.get(reply['answering']['id'])
+
+        if parent is not None:
+            parent['replies'].append(reply)
+
+    return comments
@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from math import log10
+
+from LostMinerCommunity import settings
+from api.models import Content
+
+from django.utils.timezone import now
+
+# Origem da parcela de tempo do score, para manter os valores pequenos.
+TRENDING_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+def trending_score(views: int, downloads: int, comments: int, created_at: datetime) -> float:
+    """
+        Score "em alta" de um conteúdo: log10 da atividade ponderada mais a idade em `TRENDING_TIME_SCALE_SECONDS`.
+
+        Um conteúdo novo precisa de 10x menos atividade do que um publicado `TRENDING_TIME_SCALE_SECONDS` antes
+        para ficar na mesma posição. O valor só muda com atividade nova, nunca com o passar do tempo.
+    """
+    activity = (
+        views * settings.TRENDING_VIEW_WEIGHT
+        + downloads * settings.TRENDING_DOWNLOAD_WEIGHT
+        + comments * settings.TRENDING_COMMENT_WEIGHT
+    )
+
+    return log10(max(activity, 1)) + (created_at.timestamp() - TRENDING_EPOCH) / settings.TRENDING_TIME_SCALE_SECONDS
+
+
+def update_trending_scores(batch_size: int = None) -> int:
+    """
+            Recalcula o `trending_score` dos conteúdos marcados com `trending_dirty`, em lotes de `batch_size` IDs.
+
+            A marca é removida antes da leitura dos contadores: uma atividade registrada durante o cálculo volta a
+        marcar o conteúdo, que é recalculado na próxima execução. Os conteúdos cujo score mudou têm o
+        `scored_at` atualizado (o `updated_at` continua sendo o da última edição), de modo que o ETag e as
+        respostas em cache passam a refletir a nova posição e os contadores gravados desde o último cálculo.
+
+        Retorna:
+            int: O número de conteúdos cujo score mudou.
+    """
+    batch_size = batch_size or settings.TRENDING_BATCH_SIZE
+    changed = 0
+    last_id = 0
+
+    while True:
+        ids = list(
+            Content.objects
+            .filter(trending_dirty=True, id__gt=last_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+
+        if not ids:
+            return changed
+
+        Content.objects.filter(id__in=ids).update(trending_dirty=False)
+
+        contents = Content.objects.filter(id__in=ids).only(
+            'id', 'views_count', 'downloads_count', 'comment_count', 'created_at', 'trending_score'
+        )
+        timestamp = now()
+        stale = []
+
+        for content in contents:
+            score = trending_score(content.views_count, content.downloads_count, content.comment_count, content.created_at)
+
+            if score != content.trending_score:
+                content.trending_score = score
+                content.scored_at = timestamp
+                stale.append(content)
+
+        Content.objects.bulk_update(stale, ['trending_score', 'scored_at'])
+
+        changed += len(stale)
+        last_id = ids[-1]
@@ -0,0 +1,191 @@
+from LostMinerCommunity import settings
+from api.utils.conditional import ConditionalGetMixin
+from api.utils.counters import content_counters
+from api.utils.fast_serializers import ValuesListMixin
+from api.utils.renderers import FastJSONRenderer
+from api.utils.response_cache import CachedResponseMixin, get_response_cache
+from api.views.comment import ListCommentsView
+from api.views.content import GetContentView, PaginationContentView
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied as DjangoPermissionDenied
+from django.http import Http404, HttpRequest, HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound, PermissionDenied
+from rest_framework.generics import GenericAPIView
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+class AsyncAPIView(View):
+    """
+            Base das versões assíncronas (ASGI) das views de leitura.
+
+            Cada view assíncrona reaproveita a configuração da view síncrona equivalente (`view_class`):
+        queryset, filtros, paginação, serializer e permissões. Apenas as consultas ao banco mudam, feitas
+        com o ORM assíncrono do Django, de modo que um worker ASGI atende várias requisições lentas ao
+        mesmo tempo. O status e o corpo das respostas, inclusive os de erro, são os da view síncrona.
+
+            Os handlers (`get`) retornam os dados da resposta, renderizados em `dispatch`.
+    """
+    view_class: type[GenericAPIView]
+    renderer = FastJSONRenderer()
+
+    async def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        request = Request(request)
+        view = None
+
+        try:
+            view = self.get_view(request, *args, **kwargs)
+
+            await self.check_permissions(request, view)
+
+            if request.method == 'GET':
+                return await self.conditional_dispatch(request, view, *args, **kwargs)
+
+            data = await super().dispatch(request, view, *args, **kwargs)
+
+            # `http_method_not_allowed` já retorna uma resposta pronta.
+            return data if isinstance(data, HttpResponse) else self.render(data)
+
+        except (APIException, Http404, DjangoPermissionDenied) as exc:
+            return self.render_exception(exc, {'view': view, 'args': args, 'kwargs': kwargs, 'request': request})
+
+    async def conditional_dispatch(self, request: Request, view: GenericAPIView, *args, **kwargs) -> HttpResponse:
+        """
+            Mesmo GET condicional da view síncrona (`ConditionalGetMixin`), com a agregação assíncrona.
+        """
+        validators = None
+
+        if isinstance(view, ConditionalGetMixin):
+            validators = await view.aget_conditional_validators()
+            not_modified = view.get_not_modified_response(validators)
+
+            if not_modified is not None:
+                return not_modified
+
+        if isinstance(view, CachedResponseMixin):
+            response = await self.cached_dispatch(request, view, *args, **kwargs)
+        else:
+            response = self.render(await super().dispatch(request, view, *args, **kwargs))
+
+        if isinstance(view, ConditionalGetMixin):
+            view.set_validator_headers(response, validators)
+
+        return response
+
+    async def cached_dispatch(self, request: Request, view: CachedResponseMixin, *args, **kwargs) -> HttpResponse:
+        """
+            Mesmo cache de respostas da view síncrona (`CachedResponseMixin`), com a API assíncrona do cache.
+        """
+        key = await sync_to_async(view.get_full_response_cache_key)()
+        cache = get_response_cache()
+
+        data = await cache.aget(key)
+
+        if data is not None:
+            view.record_cache_result('hit')
+            response = self.render(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        data = await super().dispatch(request, view, *args, **kwargs)
+        await cache.aset(key, data, timeout=settings.RESPONSE_CACHE_TIMEOUT_SECONDS)
+
+        view.record_cache_result('miss')
+        response = self.render(data)
+        response['X-Cache'] = 'MISS'
+
+        return response
+
+    def get_view(self, request: Request, *args, **kwargs) -> GenericAPIView:
+        view = self.view_class()
+        view.setup(request, *args, **kwargs)
+        view.format_kwarg = None
+
+        return view
+
+    @staticmethod
+    async def check_permissions(request: Request, view: GenericAPIView):
+        for permission in view.get_permissions():
+            if hasattr(permission, 'ahas_permission'):
+                allowed = await permission.ahas_permission(request, view)
+            else:
+                allowed = await sync_to_async(permission.has_permission)(request, view)
+
+            if not allowed:
+                # Mesma resposta da view síncrona, que não possui um cabeçalho `WWW-Authenticate`.
+                raise PermissionDenied(NotAuthenticated.default_detail)
+
+    def render(self, data, status: int = 200) -> HttpResponse:
+        return HttpResponse(self.renderer.render(data), status=status, content_type='application/json')
+
+    def render_exception(self, exc: Exception, context: dict) -> HttpResponse:
+        """
+            Resposta de erro pelo mesmo `exception_handler` da view síncrona: os detalhes em dicionário ou
+            lista (ex.: erros de validação) não são envolvidos em `detail`, e os cabeçalhos
+            `WWW-Authenticate` / `Retry-After` são mantidos.
+        """
+        response = api_settings.EXCEPTION_HANDLER(exc, context)
+
+        if response is None:
+            raise exc
+
+        rendered = self.render(response.data, status=response.status_code)
+
+        for header in ('WWW-Authenticate', 'Retry-After'):
+            if header in response:
+                rendered[header] = response[header]
+
+        return rendered
+
+
+class AsyncRetrieveView(AsyncAPIView):
+    async def get(self, request: Request, view: GenericAPIView, *args, **kwargs):
+        lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+        queryset = view.filter_queryset(view.get_queryset())
+
+        instance = await queryset.filter(**{view.lookup_field: kwargs[lookup_url_kwarg]}).afirst()
+
+        if instance is None:
+            raise NotFound(f'No {queryset.model._meta.object_name} matches the given query.')
+
+        return view.get_serializer(instance).data
+
+
+class AsyncListView(AsyncAPIView):
+    async def get(self, request: Request, view: GenericAPIView, *args, **kwargs):
+        values = isinstance(view, ValuesListMixin)
+        queryset = view.get_list_queryset() if values else view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+
+        if paginator is None:
+            items = [item async for item in queryset]
+
+            return view.serialize_list(items) if values else view.get_serializer(items, many=True).data
+
+        page = await paginator.apaginate_queryset(queryset, request, view)
+        data = view.serialize_list(page) if values else view.get_serializer(page, many=True).data
+
+        return paginator.get_paginated_response(data).data
+
+
+class AsyncGetContentView(AsyncRetrieveView):
+    view_class = GetContentView
+
+    async def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        response = await super().dispatch(request, *args, **kwargs)
+
+        # Mesma contagem de visualizações da view síncrona (`GetContentView.get`).
+        if request.method == 'GET' and response.status_code in (200, 304):
+            content_counters.increment('views_count', kwargs['id'])
+
+        return response
+
+
+class AsyncPaginationContentView(AsyncListView):
+    view_class = PaginationContentView
+
+
+class AsyncListCommentsView(AsyncListView):
+    view_class = ListCommentsView
@@ -1,18 +1,21 @@
 from random import randint
 from typing import Optional
 
-from api.models import User, Connection
+from api.models import Connection, User
 from api.utils.external_services import send_confirm_code
-from api.utils.permissions import IsAuthenticated
+from api.utils.permissions import IsAuthenticated, IsAuthenticatedStoredConnection
 from api.utils.validation import EMAIL_PATTERN
-from api.utils.security import create_token, verify_password, hash_password
+from api.utils.security import (
+    create_token, create_connection, verify_password, hash_password, password_needs_rehash
+)
+from api.utils.confirmation import get_confirmation_store
 
 from django.http.response import JsonResponse as JSONResponse, HttpResponse as HTTPResponse
+from rest_framework.exceptions import NotAuthenticated, PermissionDenied
 from rest_framework.request import Request
 from rest_framework.views import APIView
-from cachetools import TTLCache
 
-auth_processing_cache = TTLCache(maxsize=5000, ttl=3600)
+auth_processing_cache = get_confirmation_store()
 
 
 class Register(APIView):
@@ -118,7 +121,7 @@ class Authorize(APIView):
 
             case 'password':
                 user = User.objects.filter(id=data['user_id']).first()
-                user.password = hash_password(data['password'])
+                user.password = data['password_hash']
 
                 user.save()
 
@@ -127,9 +130,9 @@ class Authorize(APIView):
             case _:
                 return JSONResponse({'message': 'Unauthorized!'}, status=401)
 
-        connection = Connection.objects.create(user=user)
+        connection = create_connection(user.id)
 
-        token = create_token(connection.id)
+        token = create_token(connection)
 
         return JSONResponse({'token': token}, status=200)
 
@@ -170,9 +173,14 @@ class Login(APIView):
             if not verify_password(request.data['password'], user.password):
                 return JSONResponse({'message': 'Incorrect password.'}, status=401)
 
-            connection = Connection.objects.create(user=user)
+            # Refaz o hash de senhas geradas com um fator de custo desatualizado.
+            if password_needs_rehash(user.password):
+                user.password = hash_password(request.data['password'])
+                user.save(update_fields=['password'])
 
-            return JSONResponse({'token': create_token(connection.id)}, status=200)
+            connection = create_connection(user.id)
+
+            return JSONResponse({'token': create_token(connection)}, status=200)
 
         confirm_code = ''.join([str(randint(0, 9)) for _ in range(0, 6)])
 
@@ -214,9 +222,10 @@ class SetPassword(APIView):
 
         confirm_code = ''.join([str(randint(0, 9)) for _ in range(6)])
 
+        # Só o hash da nova senha vai para o armazenamento de códigos, que pode ser persistido em disco.
         auth_processing_cache[confirm_code] = {
             'user_id': user.id,
-            'password': request.data['password'],
+            'password_hash': hash_password(request.data['password']),
             'operation': 'password'
         }
 
@@ -226,15 +235,19 @@ class SetPassword(APIView):
 
 
 class RefreshToken(APIView):
-    permission_classes = (IsAuthenticated,)
+    permission_classes = (IsAuthenticatedStoredConnection,)
 
     @staticmethod
     def put(request: Request) -> JSONResponse | HTTPResponse:
         connection = request.connection
 
-        new_connection = Connection(user=connection.user)
-        new_connection.save()
+        # A remoção também invalida a conexão antiga no `connection_cache` (ver `api.signals`). Só quem
+        # remover a conexão recebe um token novo: um mesmo token não pode ser trocado duas vezes.
+        deleted, _ = Connection.objects.filter(id=connection.id).delete()
+
+        if not deleted:
+            raise PermissionDenied(NotAuthenticated.default_detail)
 
-        connection.delete()
+        new_connection = create_connection(connection.user_id)
 
-        return JSONResponse({'token': create_token(new_connection.id)}, status=200)
+        return JSONResponse({'token': create_token(new_connection)}, status=200)
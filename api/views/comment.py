@@ -1,19 +1,87 @@
 from api.utils.serializers import CommentSerializer, CommentEditSerializer
 from api.models import Comment, Content
-from api.utils.pagination import CommentPagination
+from api.utils.pagination import (
+    CommentPagination, CommentKeysetPagination, CommentTreePagination, KeysetPaginationMixin
+)
 from api.utils.permissions import IsAuthenticated, AuthorizeCommentOperation
+from api.utils.conditional import ConditionalGetMixin
+from api.utils.renderers import FAST_RENDERER_CLASSES
+from api.utils.identity import IdentityMapMixin
+from api.utils.activity import register_comment_created, register_comments_deleted
+from api.utils.threads import build_comment_tree
+from api.utils.fast_serializers import CommentValuesSerializer, ValuesListMixin
+from LostMinerCommunity import settings
+
+from django.db import transaction
 
 from rest_framework.generics import ListAPIView, CreateAPIView, UpdateAPIView, DestroyAPIView
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
 
-class ListCommentsView(ListAPIView):
+class ListCommentsView(ConditionalGetMixin, KeysetPaginationMixin, ValuesListMixin, ListAPIView):
+    """
+        Lista os comentários de um conteúdo, por ordem de criação.
+        Com o parâmetro `cursor` a paginação é feita por cursor sobre `(created_at, id)`.
+        Suporta GET condicional (`ETag` / `Last-Modified`).
+        As linhas são convertidas pelo `CommentValuesSerializer` (mesma saída do `CommentSerializer`).
+    """
+    renderer_classes = FAST_RENDERER_CLASSES
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
     pagination_class = CommentPagination
+    keyset_pagination_class = CommentKeysetPagination
 
     def get_queryset(self):
-        return Comment.objects.filter(content=self.kwargs['content_id']).order_by('created_at')
+        queryset = Comment.objects.filter(content_id=self.kwargs['content_id']).order_by('created_at')
+
+        return CommentSerializer.setup_eager_loading(queryset)
+
+
+class CommentTreeView(ConditionalGetMixin, ValuesListMixin, ListAPIView):
+    """
+        Lista as discussões de um conteúdo: os comentários de primeiro nível, por ordem de criação e
+        paginados por cursor, cada um com as respostas aninhadas em `replies`.
+
+        Todas as respostas da página são buscadas com uma única consulta (por `root`), até o nível
+        `depth` (no máximo `settings.COMMENT_TREE_MAX_DEPTH`).
+        Suporta GET condicional (`ETag` / `Last-Modified`).
+    """
+    renderer_classes = FAST_RENDERER_CLASSES
+    serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
+    pagination_class = CommentTreePagination
+
+    def get_queryset(self):
+        queryset = Comment.objects.filter(content_id=self.kwargs['content_id'], depth=0).order_by('created_at')
+
+        return CommentSerializer.setup_eager_loading(queryset)
+
+    def get_conditional_queryset(self):
+        # As respostas também fazem parte da representação.
+        return Comment.objects.filter(content_id=self.kwargs['content_id'])
+
+    def get_max_depth(self) -> int:
+        try:
+            depth = int(self.request.query_params['depth'])
+        except (KeyError, ValueError):
+            return settings.COMMENT_TREE_MAX_DEPTH
+
+        return max(0, min(depth, settings.COMMENT_TREE_MAX_DEPTH))
+
+    def list(self, request, *args, **kwargs):
+        comments = self.paginate_queryset(self.get_list_queryset())
+        max_depth = self.get_max_depth()
+        replies = []
+
+        if comments and max_depth:
+            replies = self.get_values_serializer().values(Comment.objects.filter(
+                root_id__in=[comment['id'] for comment in comments], depth__lte=max_depth
+            ).order_by('created_at', 'id'))
+
+        data = build_comment_tree(self.serialize_list(comments), self.serialize_list(replies))
+
+        return self.get_paginated_response(data)
 
 
 class CreateCommentView(CreateAPIView):
@@ -38,25 +106,37 @@ class CreateCommentView(CreateAPIView):
 
         if answering_id:
             try:
-                answering_comment = Comment.objects.get(id=answering_id, content=content)
+                answering_comment = Comment.objects.select_related('author').get(id=answering_id, content=content)
             except Comment.DoesNotExist:
                 raise NotFound({'detail': 'Answering comment not found in this content.'})
 
-        serializer.save(
-            author=self.request.connection.user,
-            content=content,
-            answering=answering_comment
-        )
+        thread = {}
 
+        if answering_comment:
+            thread = {
+                'root_id': answering_comment.root_id or answering_comment.id,
+                'depth': answering_comment.depth + 1,
+            }
+
+        with transaction.atomic():
+            comment = serializer.save(
+                author=self.request.connection.user,
+                content=content,
+                answering=answering_comment,
+                **thread
+            )
 
-class UpdateCommentView(UpdateAPIView):
+            register_comment_created(content.id, comment.created_at)
+
+
+class UpdateCommentView(IdentityMapMixin, UpdateAPIView):
     """
         Atualiza o texto de um comentário específico.
     """
 
     serializer_class = CommentEditSerializer
     permission_classes = [IsAuthenticated, AuthorizeCommentOperation]
-    queryset = Comment.objects.all()
+    queryset = CommentSerializer.setup_eager_loading(Comment.objects.all())
     lookup_field = 'id'
 
     def partial_update(self, request, *args, **kwargs):
@@ -78,8 +158,17 @@ class UpdateCommentView(UpdateAPIView):
         return Response(response_serializer.data, status=200)
 
 
-class DeleteComment(DestroyAPIView):
+class DeleteComment(IdentityMapMixin, DestroyAPIView):
+    """
+        Remove um comentário e, em cascata, as respostas a ele.
+    """
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated, AuthorizeCommentOperation]
     lookup_field = 'id'
     queryset = Comment.objects.all()
+
+    def perform_destroy(self, instance: Comment):
+        with transaction.atomic():
+            _, deleted = instance.delete()
+
+            register_comments_deleted(instance.content_id, deleted.get(Comment._meta.label, 0))
@@ -1,18 +1,41 @@
+from collections import Counter
+
 from rest_framework.response import Response
 
 from api.models import Content
-from api.utils.serializers import ContentSerializer
+from LostMinerCommunity import settings
+from api.utils.serializers import ContentSerializer, ContentBulkSerializer
 from api.utils.permissions import IsAuthenticated, AuthorizeContentOperation
-from api.utils.pagination import ContentPagination
-from api.utils.external_services import upload_image
+from api.utils.pagination import (
+    ContentPagination, ContentKeysetPagination, ContentSearchPagination, KeysetPagination, KeysetPaginationMixin
+)
+from api.utils.search import search_contents
+from api.utils.filters import ContentFilterBackend
+from api.utils.fast_serializers import ContentValuesSerializer, ValuesListMixin, get_values_serializer
+from api.utils.external_services import upload_images
+from api.utils.response_cache import (
+    CachedResponseMixin, content_cache_key, content_list_cache_key, invalidate_content
+)
+from api.utils.conditional import ConditionalGetMixin
+from api.utils.renderers import FAST_RENDERER_CLASSES
+from api.utils.identity import IdentityMapMixin
+from api.utils.counters import content_counters
+from api.utils.changes import get_content_changes, record_content_changes
+from api.utils.export import export_lines, get_export_queryset, gzip_stream
 
 from rest_framework.generics import (
-    CreateAPIView, RetrieveAPIView, ListAPIView, DestroyAPIView, UpdateAPIView
+    CreateAPIView, RetrieveAPIView, ListAPIView, DestroyAPIView, UpdateAPIView, GenericAPIView
 )
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.filters import OrderingFilter
 from rest_framework.request import Request
 from rest_framework.views import APIView
 
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import HttpResponseRedirect, StreamingHttpResponse
+from django.utils.timezone import now
+
 
 class CreateContentView(CreateAPIView):
     """
@@ -42,24 +65,229 @@ class CreateContentView(CreateAPIView):
         serializer.save(author=self.request.connection.user)
 
 
-class GetContentView(RetrieveAPIView):
+class BulkContentView(APIView):
+    """
+    View para criar e atualizar vários conteúdos em uma única requisição.
+
+    O corpo é uma lista de conteúdos (no máximo `settings.CONTENT_BULK_MAX_ITEMS`). Itens com `id`
+    atualizam (parcialmente) um conteúdo do usuário; os demais criam conteúdos novos.
+
+    Permissões:
+        - O usuário deve estar autenticado.
+        - Os conteúdos atualizados devem ser do usuário.
+
+    O lote inteiro é validado antes de qualquer escrita, e as restrições de unicidade (nome e versão,
+    `download_url`) são verificadas com uma única consulta, inclusive entre os próprios itens. Se algum
+    item for inválido nada é gravado, e a resposta (400) traz em `errors` os erros de cada item, na
+    mesma ordem do corpo. Caso contrário os conteúdos são gravados com `bulk_create` / `bulk_update`
+    em uma transação, e a resposta (201) traz os conteúdos na mesma ordem.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    # noinspection PyUnresolvedReferences
+    def post(self, request: Request):
+        items = request.data
+
+        if not isinstance(items, list) or not items:
+            return Response({'detail': 'Expected a non-empty list of contents.'}, 400)
+
+        if len(items) > settings.CONTENT_BULK_MAX_ITEMS:
+            return Response({'detail': f'At most {settings.CONTENT_BULK_MAX_ITEMS} contents per request.'}, 400)
+
+        user = request.connection.user
+        errors = [{} for _ in items]
+
+        ids = [
+            item['id'] for item in items
+            if isinstance(item, dict) and KeysetPagination.is_valid_integer(item.get('id'))
+        ]
+        instances = ContentSerializer.setup_eager_loading(
+            Content.objects.filter(id__in=ids, author_id=user.id)
+        ).in_bulk()
+
+        contents: list[Content] = []
+        update_fields = set()
+
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors[index] = {'non_field_errors': ['Expected a content object.']}
+                contents.append(None)
+                continue
+
+            pk = item.get('id')
+
+            # Listas, objetos e booleanos não podem ser buscados (nem são chaves do `in_bulk`).
+            if pk is not None and not KeysetPagination.is_valid_integer(pk):
+                errors[index] = {'id': ['A valid integer is required.']}
+                contents.append(None)
+                continue
+
+            instance = instances.get(pk) if pk is not None else None
+
+            if pk is not None and instance is None:
+                errors[index] = {'id': ['Content not found.']}
+                contents.append(None)
+                continue
+
+            serializer = ContentBulkSerializer(instance, data=item, partial=instance is not None)
+
+            if not serializer.is_valid():
+                errors[index] = serializer.errors
+                contents.append(None)
+                continue
+
+            if instance is None:
+                instance = Content(author=user, **serializer.validated_data)
+            else:
+                for field, value in serializer.validated_data.items():
+                    setattr(instance, field, value)
+
+                update_fields.update(serializer.validated_data)
+
+            contents.append(instance)
+
+        self.validate_unique(contents, errors)
+
+        if any(errors):
+            return Response({'errors': errors}, 400)
+
+        created = [content for content in contents if content.pk is None]
+        updated = [content for content in contents if content.pk is not None]
+
+        try:
+            with transaction.atomic():
+                Content.objects.bulk_create(created)
+
+                if updated:
+                    # O `bulk_update` não aplica o `auto_now`.
+                    timestamp = now()
+
+                    for content in updated:
+                        content.updated_at = timestamp
+
+                    Content.objects.bulk_update(updated, [*update_fields, 'updated_at'])
+
+                # As escritas em lote não disparam os sinais do modelo.
+                record_content_changes(content.id for content in contents)
+
+        except IntegrityError:
+            # Conflito com uma escrita concorrente feita após a validação.
+            return Response({'detail': 'Conflict with existing contents, try again.'}, 409)
+
+        # As escritas em lote não disparam os sinais do modelo.
+        for content in contents:
+            invalidate_content(content.id)
+
+        return Response(ContentSerializer(contents, many=True).data, 201)
+
+    @staticmethod
+    def validate_unique(contents: list[Content], errors: list[dict]):
+        """
+            Verifica `unique_name_version` e a unicidade de `download_url` para os itens válidos do lote,
+            contra o banco (uma consulta) e entre os próprios itens.
+        """
+        valid = [content for content in contents if content is not None]
+
+        if not valid:
+            return
+
+        pairs = Counter((content.name, content.version) for content in valid)
+        urls = Counter(content.download_url for content in valid)
+
+        # Os conteúdos atualizados no lote são comparados pelos seus valores novos, entre os próprios itens.
+        updated_ids = [content.pk for content in valid if content.pk is not None]
+
+        conditions = Q(download_url__in=list(urls))
+
+        for name, version in pairs:
+            conditions |= Q(name=name, version=version)
+
+        existing_pairs, existing_urls = set(), set()
+
+        for name, version, url in Content.objects.filter(conditions).exclude(
+                id__in=updated_ids
+        ).values_list('name', 'version', 'download_url'):
+            existing_pairs.add((name, version))
+            existing_urls.add(url)
+
+        for index, content in enumerate(contents):
+            if content is None:
+                continue
+
+            pair = (content.name, content.version)
+
+            if pair in existing_pairs or pairs[pair] > 1:
+                errors[index].setdefault('non_field_errors', []).append(
+                    'The fields name, version must make a unique set.'
+                )
+
+            if content.download_url in existing_urls or urls[content.download_url] > 1:
+                errors[index].setdefault('download_url', []).append('content with this download url already exists.')
+
+
+class GetContentView(ConditionalGetMixin, CachedResponseMixin, RetrieveAPIView):
     """
     View para recuperar um conteúdo específico.
 
     Esta view permite que qualquer usuário obtenha detalhes de um conteúdo específico
     com base no seu ID.
 
-    A resposta será o conteúdo serializado.
+    A resposta será o conteúdo serializado, mantida em cache até o conteúdo ser alterado.
+    Suporta GET condicional (`ETag` / `Last-Modified`).
+
+    Cada resposta 200 ou 304 (inclusive as servidas pelo cache) conta uma visualização em
+    `views_count`, acumulada no `content_counters` e gravada em lote.
 
     Permissões:
         - Nenhuma permissão necessária, qualquer usuário pode visualizar o conteúdo.
     """
+    renderer_classes = FAST_RENDERER_CLASSES
     serializer_class = ContentSerializer
-    queryset = Content.objects.all()
+    queryset = ContentSerializer.setup_eager_loading(Content.objects.all())
     lookup_field = 'id'
+    response_cache_name = 'get_content'
+    conditional_requires_object = True
+    conditional_fields = ('updated_at', 'scored_at')
+
+    def get_conditional_queryset(self):
+        return Content.objects.filter(id=self.kwargs['id'])
+
+    def get_response_cache_key(self) -> str:
+        return content_cache_key(self.kwargs['id'])
+
+    def get(self, request, *args, **kwargs) -> Response:
+        response = super().get(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            content_counters.increment('views_count', self.kwargs['id'])
+
+        return response
+
+
+class DownloadContentView(APIView):
+    """
+    Redireciona para o `download_url` de um conteúdo, contando o download em `downloads_count`.
 
+    A contagem é acumulada no `content_counters` e gravada em lote, de modo que o redirecionamento
+    custa apenas a leitura da URL.
 
-class PaginationContentView(ListAPIView):
+    Permissões:
+        - Nenhuma permissão necessária.
+    """
+
+    @staticmethod
+    def get(request: Request, id: int) -> HttpResponseRedirect:
+        download_url = Content.objects.filter(id=id).values_list('download_url', flat=True).first()
+
+        if download_url is None:
+            raise NotFound('No Content matches the given query.')
+
+        content_counters.increment('downloads_count', id)
+
+        return HttpResponseRedirect(download_url)
+
+
+class PaginationContentView(ConditionalGetMixin, CachedResponseMixin, KeysetPaginationMixin, ValuesListMixin, ListAPIView):
     """
     View para listar conteúdos com paginação.
 
@@ -69,18 +297,170 @@ class PaginationContentView(ListAPIView):
     Permissões:
         - O usuário deve estar autenticado.
 
+    Filtros:
+        - `category`, prefixo de `version`, `resolution` (ou `resolution_min` / `resolution_max`)
+          e `author` (`api.utils.filters.ContentFilterBackend`).
+
     Ordenação:
-        - Os conteúdos podem ser ordenados por `created_at` ou `name`.
+        - Os conteúdos podem ser ordenados por `created_at`, `name`, `comment_count`
+          (`-comment_count` para os mais comentados) ou `trending_score` (`-trending_score`
+          para os em alta, calculado em segundo plano por `api.utils.trending`).
+
+    Paginação:
+        - Por número de página (`page`), ou por cursor quando o parâmetro `cursor` é
+          informado (vazio na primeira página), sem `OFFSET` nem `COUNT(*)`.
+
+    As páginas ficam em cache até que algum conteúdo seja alterado, e suportam GET
+    condicional (`ETag` / `Last-Modified`). As linhas são lidas com `.values()` e convertidas
+    pelo `ContentValuesSerializer`, com a mesma saída do `ContentSerializer`.
     """
+    renderer_classes = FAST_RENDERER_CLASSES
     serializer_class = ContentSerializer
-    queryset = Content.objects.all()
+    values_serializer_class = ContentValuesSerializer
+    queryset = ContentSerializer.setup_eager_loading(Content.objects.all())
     pagination_class = ContentPagination
-    filter_backends = [OrderingFilter]
-    ordering_fields = ('created_at', 'name')
+    keyset_pagination_class = ContentKeysetPagination
+    filter_backends = [ContentFilterBackend, OrderingFilter]
+    ordering_fields = ('created_at', 'name', 'comment_count', 'trending_score')
     ordering = ('created_at',)
+    response_cache_name = 'pagination'
+    conditional_fields = ('updated_at', 'scored_at')
+
+    def get_response_cache_key(self) -> str:
+        return content_list_cache_key(self.request)
+
+
+class SearchContentsView(ListAPIView):
+    """
+    View para buscar conteúdos por texto.
 
+    Esta view permite que qualquer usuário busque conteúdos pelo nome e pela descrição
+    (parâmetro `q`). Todos os termos informados devem aparecer (por prefixo), e os
+    resultados são ordenados pela relevância (`api.utils.search`).
 
-class UpdateContentView(UpdateAPIView):
+    Filtros:
+        - Os mesmos de `contents/list/` (`api.utils.filters.ContentFilterBackend`).
+
+    Paginação:
+        - Por cursor (`cursor`), sobre a relevância e o `id`.
+    """
+    serializer_class = ContentSerializer
+    queryset = ContentSerializer.setup_eager_loading(Content.objects.all())
+    pagination_class = ContentSearchPagination
+    filter_backends = [ContentFilterBackend]
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+
+        if not query:
+            raise ValidationError({'q': 'This field is required.'})
+
+        queryset = super().get_queryset()
+
+        return search_contents(queryset, query).order_by('-rank', '-id')
+
+
+class ContentChangesView(APIView):
+    """
+    Feed incremental do catálogo, para espelhos que precisam se manter sincronizados.
+
+    Retorna os conteúdos criados ou alterados e os IDs dos removidos após a marca d'água `since`
+    (0 na primeira sincronização, que recebe o catálogo inteiro), junto com a nova marca d'água.
+    Enquanto `has_more` for verdadeiro, o cliente repete a requisição com a marca d'água retornada.
+
+    O feed é lido da tabela `ContentChange` (`api.utils.changes`), que guarda apenas a última alteração
+    de cada conteúdo: uma sincronização custa O(alterações), e não O(catálogo). Os comentários
+    (`comment_count` / `last_comment_at`) geram alterações; os contadores de visualizações e downloads
+    e o `trending_score`, gravados em lote, não.
+
+    Permissões:
+        - Nenhuma permissão necessária.
+    """
+    renderer_classes = FAST_RENDERER_CLASSES
+
+    @staticmethod
+    def get(request: Request) -> Response:
+        since = ContentChangesView.get_integer_param(request, 'since', 0)
+        limit = min(
+            ContentChangesView.get_integer_param(request, 'limit', settings.CONTENT_CHANGES_PAGE_SIZE) or 1,
+            settings.CONTENT_CHANGES_MAX_PAGE_SIZE
+        )
+
+        changes, has_more = get_content_changes(since, limit)
+
+        updated_ids = [content_id for _, content_id, deleted in changes if not deleted]
+        values_serializer = get_values_serializer(ContentValuesSerializer)
+
+        contents = values_serializer.serialize(values_serializer.values(
+            ContentSerializer.setup_eager_loading(Content.objects.filter(id__in=updated_ids)).order_by('id')
+        ))
+
+        # Um conteúdo removido depois da leitura das alterações também é informado como removido.
+        found = {content['id'] for content in contents}
+        deleted = sorted({content_id for _, content_id, _ in changes} - found)
+
+        return Response({
+            'watermark': changes[-1][0] if changes else since,
+            'has_more': has_more,
+            'contents': contents,
+            'deleted': deleted,
+        })
+
+    @staticmethod
+    def get_integer_param(request: Request, name: str, default: int) -> int:
+        value = request.query_params.get(name)
+
+        if value is None:
+            return default
+
+        try:
+            number = int(value)
+        except ValueError:
+            number = -1
+
+        # `since` é comparado com uma coluna `bigint`: valores fora do intervalo não chegam ao banco.
+        if not 0 <= number < 2 ** 63:
+            raise ValidationError({name: 'A non-negative 64-bit integer is required.'})
+
+        return number
+
+
+class ExportContentsView(APIView):
+    """
+    Exportação do catálogo em NDJSON (um conteúdo por linha), para cargas em lote e espelhos.
+
+    A resposta é transmitida à medida que os conteúdos são lidos (`api.utils.export`), com uso de memória
+    constante independentemente do tamanho do catálogo.
+
+    Parâmetros:
+        - Os filtros de `contents/list/` (`category`, `version`, `resolution`, `author`...).
+        - `created_after`, `created_before`: intervalo de criação, inclusivo (ISO 8601).
+        - `comments=true`: inclui os comentários de cada conteúdo no campo `comments`.
+        - `gzip=true`: comprime a exportação (`catalog.ndjson.gz`).
+
+    Permissões:
+        - Nenhuma permissão necessária.
+    """
+
+    @staticmethod
+    def get(request: Request) -> StreamingHttpResponse:
+        params = request.query_params
+
+        # Os filtros são validados antes do início da resposta, para que um erro ainda seja um 400.
+        queryset = get_export_queryset(params)
+        stream = export_lines(queryset, comments=params.get('comments', '').lower() in ('1', 'true'))
+
+        if params.get('gzip', '').lower() in ('1', 'true'):
+            response = StreamingHttpResponse(gzip_stream(stream), content_type='application/gzip')
+            response['Content-Disposition'] = 'attachment; filename="catalog.ndjson.gz"'
+        else:
+            response = StreamingHttpResponse(stream, content_type='application/x-ndjson')
+            response['Content-Disposition'] = 'attachment; filename="catalog.ndjson"'
+
+        return response
+
+
+class UpdateContentView(IdentityMapMixin, UpdateAPIView):
     """
     View para atualizar um conteúdo específico.
 
@@ -94,7 +474,7 @@ class UpdateContentView(UpdateAPIView):
     `perform_update` garante que o autor do conteúdo será o usuário autenticado.
     """
     permission_classes = [IsAuthenticated, AuthorizeContentOperation]
-    queryset = Content.objects.all()
+    queryset = ContentSerializer.setup_eager_loading(Content.objects.all())
     lookup_field = 'id'
     serializer_class = ContentSerializer
 
@@ -107,10 +487,10 @@ class UpdateContentView(UpdateAPIView):
             serializer (ContentSerializer): O serializer que valida e salva os dados do conteúdo.
         """
 
-        serializer.save(author=self.request.connection.user)
+        serializer.save(author_id=self.request.connection.user_id)
 
 
-class DeleteContentView(DestroyAPIView):
+class DeleteContentView(IdentityMapMixin, DestroyAPIView):
     """
     View para excluir um conteúdo específico.
 
@@ -129,7 +509,7 @@ class DeleteContentView(DestroyAPIView):
     serializer_class = ContentSerializer
 
 
-class UploadImagesView(APIView):
+class UploadImagesView(IdentityMapMixin, GenericAPIView):
     """
     View para fazer upload de imagens para um conteúdo existente.
 
@@ -141,35 +521,34 @@ class UploadImagesView(APIView):
         - O usuário deve estar autenticado.
         - O usuário deve ser o autor do conteúdo.
 
-    O conteúdo será atualizado com os links das imagens armazenadas.
+    O conteúdo será atualizado com os links das imagens armazenadas. O serviço de
+    armazenamento é definido por `settings.IMAGE_STORAGE_BACKEND`.
     """
 
     permission_classes = [IsAuthenticated, AuthorizeContentOperation]
+    queryset = ContentSerializer.setup_eager_loading(Content.objects.all())
+    lookup_field = 'id'
+    serializer_class = ContentSerializer
 
-    @staticmethod
-    def post(request: Request, id: int):
+    def post(self, request: Request, id: int):
         """
         Processa o upload das imagens e associa as URLs ao conteúdo.
 
         Args:
             request (Request): A requisição contendo as imagens a serem enviadas.
             id (int): O ID do conteúdo ao qual as imagens serão associadas.
-            format (str, opcional): O formato de resposta (não utilizado neste exemplo).
 
         Returns:
-            Response: Resposta com os dados do conteúdo atualizado (incluindo as URLs das imagens)
-                      ou uma mensagem de erro se o conteúdo não for encontrado.
+            Response: Resposta com os dados do conteúdo atualizado (incluindo as URLs das imagens).
+                      Conteúdos inexistentes resultam em 404 no `get_object`.
         """
-        content: Content = Content.objects.get(id=id)
-
-        if not content:
-            return Response({'details': 'Content not found'}, 404)
-
-        imagens = request.FILES
+        # O mesmo objeto usado na verificação de autoria; não há uma segunda busca.
+        content: Content = self.get_object()
 
-        for name, image in imagens.items():
-            content.images_urls[name] = upload_image(image, 'contents')
+        # Os uploads são feitos em paralelo; o conteúdo é salvo uma única vez ao final.
+        content.images_urls.update(upload_images(request.FILES, 'contents'))
 
-        content.save()
+        # O `auto_now` só é aplicado quando o campo está em `update_fields`; sem ele, o ETag não mudaria.
+        content.save(update_fields=['images_urls', 'updated_at'])
 
-        return Response(ContentSerializer(content).data, 200)
+        return Response(self.get_serializer(content).data, 200)
@@ -0,0 +1,45 @@
+from hmac import compare_digest
+
+from LostMinerCommunity import settings
+from api.utils import metrics
+
+# Registram os seus coletores (`metrics.register_collector`) ao serem importados.
+from api.utils import counters, mail_queue  # noqa: F401
+
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+
+
+class MetricsView(View):
+    """
+            Expõe as métricas no formato de texto do Prometheus (`/metrics`).
+
+            Com `settings.METRICS_MULTIPROCESS_DIR`, a resposta soma as métricas gravadas por todos os workers
+        (`metrics.merge_snapshots`), e não só as do worker que atendeu a coleta.
+
+            A coleta deve enviar `Authorization: Bearer <settings.METRICS_TOKEN>`. Sem o token configurado,
+        as métricas só são expostas com `DEBUG`.
+    """
+
+    def get(self, request: HttpRequest) -> HttpResponse:
+        if settings.METRICS_TOKEN:
+            authorization = request.headers.get('Authorization', '').encode('utf-8')
+
+            if not compare_digest(authorization, f'Bearer {settings.METRICS_TOKEN}'.encode('utf-8')):
+                return HttpResponse(status=401)
+
+        elif not settings.DEBUG:
+            return HttpResponse(status=403)
+
+        directory = settings.METRICS_MULTIPROCESS_DIR
+
+        if directory:
+            metrics.write_snapshot(directory)
+            data = metrics.merge_snapshots(directory)
+        else:
+            data = metrics.local_metrics()
+
+        return HttpResponse(
+            metrics.render_prometheus(data),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
@@ -1 +1,3 @@
+rm -rf "${METRICS_MULTIPROCESS_DIR:-.cache/metrics}"
+export COUNTERS_FLUSH_INTERVAL_SECONDS="${COUNTERS_FLUSH_INTERVAL_SECONDS:-10}"
 gunicorn LostMinerCommunity.wsgi:application --workers 3 --bind 0.0.0.0:8000